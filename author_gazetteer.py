@@ -0,0 +1,142 @@
+"""
+Author Gazetteer for Maturita Portal
+
+Builds a gazetteer of author names and titles from the scraped catalog and
+stores the author names in a token trie. Matching the longest author
+prefix of a tokenized PDF filename then tells where the author ends and
+the title begins, e.g.
+
+    Antoine_de_Saint_Exupery_Maly_princ.pdf -> Antoine de Saint-Exupéry | Maly princ
+
+Names are compared without diacritics, case and punctuation, so
+"Zdenek_Jirotka" in a filename matches "Zdeněk Jirotka" in the catalog.
+
+Catalog sources (whichever exist):
+    books_info.txt                 - output of scrape_books.py / extract_books_info.py
+    .cache/frontier/*.json         - crawl state of the scrapers
+    literatura/books.json          - hand-maintained book list
+"""
+
+import glob
+import json
+import os
+import re
+import unicodedata
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Placeholder values the scrapers write when a field is missing
+UNKNOWN_VALUES = {'', 'unknown', 'nezjištěno', 'neznámý autor'}
+
+# Trie node key marking the end of an author name
+END = '$'
+
+
+def fold(text):
+    """
+    Normalize text for matching: no diacritics, lowercase, no punctuation.
+    """
+    text = unicodedata.normalize('NFKD', text)
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return re.sub(r'[^a-z0-9]+', ' ', text.lower()).strip()
+
+
+def tokenize(text):
+    """
+    Split text into match keys, one per word (hyphens and underscores split).
+    """
+    return fold(text.replace('_', ' ')).split()
+
+
+def load_catalog_entries(script_dir=SCRIPT_DIR):
+    """
+    Load (title, author) pairs from every available catalog source.
+    """
+    entries = []
+
+    books_info_path = os.path.join(script_dir, "books_info.txt")
+    if os.path.exists(books_info_path):
+        with open(books_info_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Format: "Title, Author, Genre - URL"
+                info = line.split(' - ', 1)[0]
+                parts = [part.strip() for part in info.split(',')]
+                if len(parts) >= 2:
+                    entries.append((parts[0], parts[1]))
+
+    for state_path in glob.glob(os.path.join(script_dir, ".cache", "frontier", "*.json")):
+        try:
+            with open(state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for book in state.values():
+            entries.append((book.get('title', ''), book.get('author', '')))
+
+    books_json_path = os.path.join(script_dir, "literatura", "books.json")
+    if os.path.exists(books_json_path):
+        with open(books_json_path, 'r', encoding='utf-8') as f:
+            for book in json.load(f):
+                entries.append((book.get('title', ''), book.get('author', '')))
+
+    return [(title, author) for title, author in entries
+            if author.strip().lower() not in UNKNOWN_VALUES]
+
+
+def build_gazetteer(entries=None):
+    """
+    Build the author trie and title index.
+
+    Args:
+        entries: (title, author) pairs; defaults to load_catalog_entries()
+
+    Returns:
+        Dictionary with 'authors' (token trie, END holds the display name)
+        and 'titles' (folded title -> display title)
+    """
+    if entries is None:
+        entries = load_catalog_entries()
+
+    authors = {}
+    titles = {}
+
+    for title, author in entries:
+        tokens = tokenize(author)
+        if tokens:
+            node = authors
+            for token in tokens:
+                node = node.setdefault(token, {})
+            # The first spelling seen wins
+            node.setdefault(END, author.strip())
+
+        if title and title.strip().lower() not in UNKNOWN_VALUES:
+            titles.setdefault(fold(title), title.strip())
+
+    return {'authors': authors, 'titles': titles}
+
+
+def match_author(keys, trie):
+    """
+    Find the longest author name at the start of a list of match keys.
+
+    Args:
+        keys: Match keys of the filename words ("" for separators)
+        trie: Author trie from build_gazetteer()
+
+    Returns:
+        Tuple of (display name, number of keys consumed), or (None, 0)
+    """
+    node = trie
+    best = (None, 0)
+
+    for i, key in enumerate(keys):
+        if not key:
+            # Separators like "-" neither match nor end a name
+            continue
+        node = node.get(key)
+        if node is None:
+            break
+        if END in node:
+            best = (node[END], i + 1)
+
+    return best
@@ -0,0 +1,291 @@
+"""
+Book Detail Page Parser for Maturita Portal
+
+Parses a milujemecestinu.cz book detail page in a single pass, without
+building a document tree. Only the parts the scrapers need are kept:
+
+    title  - text of the first <h1> (or <h2> if there is no <h1>)
+    links  - href of every <a>, in document order
+    rows   - cell texts of every table row
+    text   - visible text, one line per block element, for "Autor: ..."
+             style labels
+
+Uses lxml's event parser when lxml is installed and falls back to the
+standard library html.parser otherwise.
+
+Run it directly to benchmark pages per second against the old
+BeautifulSoup full-tree approach on saved pages (fixtures/pages by
+default) or on the HTML pages of a recorded cassette (see
+http_cassette.py):
+
+    python book_page_parser.py [fixture_dir | cassette_dir]
+
+Requirements:
+    pip install lxml  (optional, faster)
+"""
+
+import codecs
+import os
+import re
+import sys
+import time
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+
+CHARSET_RE = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_-]+)', re.IGNORECASE)
+
+# Elements that start a new line in the extracted text
+BLOCK_TAGS = {
+    'address', 'article', 'br', 'dd', 'div', 'dl', 'dt', 'footer', 'h1', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'header', 'hr', 'li', 'nav', 'ol', 'p', 'section', 'table',
+    'td', 'th', 'tr', 'ul'
+}
+
+# Elements whose content is never visible text
+SKIP_TAGS = {'script', 'style', 'noscript', 'template'}
+
+
+class DetailPageCollector:
+    """
+    Parser target that collects title, links, table rows and text.
+
+    Implements the lxml target interface (start/end/data/close); the
+    standard library fallback feeds it through _StdlibFeeder.
+    """
+
+    def __init__(self):
+        self.h1 = None
+        self.h2 = None
+        self.links = []
+        self.rows = []
+        self.text_parts = []
+
+        self._heading = None
+        self._heading_parts = []
+        self._row = None
+        self._cell = None
+        self._skip_depth = 0
+
+    def start(self, tag, attrs):
+        tag = tag.lower()
+
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+            return
+        if tag in BLOCK_TAGS:
+            self.text_parts.append('\n')
+
+        if tag == 'a':
+            href = attrs.get('href')
+            if href:
+                self.links.append(href)
+        elif tag in ('h1', 'h2') and self._heading is None and getattr(self, tag) is None:
+            self._heading = tag
+            self._heading_parts = []
+        elif tag == 'tr':
+            self._row = []
+            self._cell = None
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = []
+            self._row.append(self._cell)
+
+    def end(self, tag):
+        tag = tag.lower()
+
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+            return
+        if tag in BLOCK_TAGS:
+            self.text_parts.append('\n')
+
+        if tag == self._heading:
+            setattr(self, tag, ''.join(self._heading_parts).strip())
+            self._heading = None
+        elif tag in ('td', 'th'):
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.rows.append([''.join(cell).strip() for cell in self._row])
+            self._row = None
+            self._cell = None
+
+    def data(self, data):
+        if self._skip_depth:
+            return
+        self.text_parts.append(data)
+        if self._heading is not None:
+            self._heading_parts.append(data)
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def close(self):
+        return {
+            'title': self.h1 if self.h1 is not None else self.h2,
+            'links': self.links,
+            'rows': self.rows,
+            'text': ''.join(self.text_parts)
+        }
+
+
+class _StdlibFeeder(HTMLParser):
+    """Feed standard library html.parser events into a collector."""
+
+    def __init__(self, target):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        if tag == 'br':
+            self.target.end(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        self.target.start(tag, dict(attrs))
+        self.target.end(tag)
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def detect_encoding(content):
+    """
+    Return the charset declared in the page's <meta> tags, or utf-8.
+    """
+    match = CHARSET_RE.search(content[:4096])
+    if match:
+        encoding = match.group(1).decode('ascii')
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except LookupError:
+            pass
+    return 'utf-8'
+
+
+def parse_detail_page(content):
+    """
+    Parse a book detail page in one pass.
+
+    Args:
+        content: Page HTML as bytes (e.g. response.content) or str
+
+    Returns:
+        Dictionary with title (or None), links, rows and text
+    """
+    collector = DetailPageCollector()
+
+    if isinstance(content, bytes):
+        content = content.decode(detect_encoding(content), errors='replace')
+
+    if etree is not None:
+        parser = etree.HTMLParser(target=collector)
+        parser.feed(content)
+        return parser.close()
+
+    feeder = _StdlibFeeder(collector)
+    feeder.feed(content)
+    feeder.close()
+    return collector.close()
+
+
+def find_label(text, patterns, flags=0):
+    """
+    Return the value after the first matching "Label: value" pattern, or None.
+    """
+    for pattern in patterns:
+        match = re.search(pattern, text, flags)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+def _legacy_parse(content):
+    """The previous BeautifulSoup approach, kept for benchmark comparison."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, 'html.parser')
+    title_tag = soup.find('h1') or soup.find('h2')
+    links = [link['href'] for link in soup.find_all('a', href=True)]
+    text = soup.get_text()
+    rows = [[cell.get_text().strip() for cell in row.find_all(['td', 'th'])]
+            for row in soup.find_all('tr')]
+    return title_tag, links, text, rows
+
+
+def load_pages(directory):
+    """
+    Return the saved pages of a fixture directory, or the recorded HTML
+    pages if it is a cassette.
+    """
+    pages = []
+    if not os.path.isdir(directory):
+        return pages
+
+    from http_cassette import INDEX_NAME, Cassette
+
+    if os.path.exists(os.path.join(directory, INDEX_NAME)):
+        cassette = Cassette(directory)
+        for url, entry in sorted(cassette.entries.items()):
+            if entry['status'] == 200 and 'html' in entry['content_type']:
+                pages.append(cassette.load(url)[2])
+        return pages
+
+    for name in sorted(os.listdir(directory)):
+        if name.endswith(('.html', '.htm')):
+            with open(os.path.join(directory, name), 'rb') as f:
+                pages.append(f.read())
+    return pages
+
+
+def main():
+    """Benchmark parsing speed on saved detail pages."""
+
+    fixture_dir = sys.argv[1] if len(sys.argv) > 1 else FIXTURE_DIR
+    pages = load_pages(fixture_dir)
+
+    print("=" * 60)
+    print("Detail Page Parser Benchmark")
+    print("=" * 60)
+
+    if not pages:
+        print(f"No saved pages found in {fixture_dir}")
+        print("Save some book detail pages there as .html files, or pass a cassette")
+        print("=" * 60)
+        return
+
+    parser_name = 'lxml' if etree is not None else 'html.parser'
+    rounds = max(1, 200 // len(pages))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            parse_detail_page(page)
+    new_rate = rounds * len(pages) / (time.perf_counter() - start)
+
+    print(f"  Pages: {len(pages)} x {rounds} rounds")
+    print(f"  One-pass parser ({parser_name}): {new_rate:.0f} pages/s")
+
+    try:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                _legacy_parse(page)
+        old_rate = rounds * len(pages) / (time.perf_counter() - start)
+        print(f"  BeautifulSoup full tree: {old_rate:.0f} pages/s")
+        print(f"  Speedup: {new_rate / old_rate:.1f}x")
+    except ImportError:
+        print("  BeautifulSoup not installed, skipping comparison")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
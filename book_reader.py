@@ -0,0 +1,297 @@
+"""
+Full-Text Reader Chunks for Maturita Portal
+
+Book pages only contain a short excerpt. The full text from
+literatura/text/<slug>.txt is split into chunks of whole paragraphs,
+written as small HTML fragments next to an offset index:
+
+    literatura/chunks/<slug>/index.json
+        {
+          "version": "...",     - hash of the text and the chunking
+          "length": 11431,      - characters in the text
+          "chunks": [{"file": "000.html", "offset": 0, "length": 4012}, ...]
+        }
+    literatura/chunks/<slug>/000.html, 001.html, ...
+
+The reader in script.js loads the index and then one chunk after another
+as the student scrolls, taking the paragraphs from each chunk's <main>, so
+a book page weighs the same however long the book is. Every chunk is also
+a small UTF-8 document of its own with links to the previous and next
+part, so the whole text can be read without JavaScript. Texts are read in
+a stream, and unchanged texts are skipped by the version in their index.
+
+Usage:
+    python book_reader.py              write chunks for all book pages
+    python book_reader.py <slug> ...   write chunks for these books
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEXT_DIR = os.path.join(SCRIPT_DIR, "literatura", "text")
+HTML_DIR = os.path.join(SCRIPT_DIR, "literatura")
+CHUNKS_DIR = os.path.join(HTML_DIR, "chunks")
+
+# Target chunk size in characters; a longer paragraph gets a chunk of its own
+CHUNK_SIZE = 4000
+
+INDEX_NAME = "index.json"
+
+# Bump whenever the fragment markup changes, so all chunks are redone
+READER_VERSION = "2"
+
+# Book pages that contain the reader (written by generate_html_page())
+READER_MARKER = 'class="book-reader"'
+
+# Paragraphs are separated by empty lines, which may hold spaces
+PARAGRAPH_BREAK_RE = re.compile(r'\n[ \t]*\n\s*')
+
+
+def iter_paragraphs(chunks):
+    """
+    Split a text into paragraphs.
+
+    Args:
+        chunks: Iterable of text chunks (see iter_text_file())
+
+    Yields:
+        Tuples of (offset of the paragraph in the text, paragraph)
+    """
+    buffer = ""
+    buffer_offset = 0
+
+    def paragraph_at(start, paragraph):
+        # The offset points at the first character of the paragraph itself,
+        # wherever the chunk boundaries fell
+        stripped = paragraph.lstrip()
+        return buffer_offset + start + len(paragraph) - len(stripped), stripped.rstrip()
+
+    for chunk in chunks:
+        buffer += chunk
+        end = 0
+        for match in PARAGRAPH_BREAK_RE.finditer(buffer):
+            if buffer[end:match.start()].strip():
+                yield paragraph_at(end, buffer[end:match.start()])
+            end = match.end()
+        buffer = buffer[end:]
+        buffer_offset += end
+
+    if buffer.strip():
+        yield paragraph_at(0, buffer)
+
+
+def iter_chunks(paragraphs, chunk_size=CHUNK_SIZE):
+    """
+    Group paragraphs into chunks of about chunk_size characters.
+
+    Yields:
+        Tuples of (offset of the chunk in the text, list of paragraphs)
+    """
+    current = []
+    size = 0
+    start = 0
+
+    for offset, paragraph in paragraphs:
+        if current and size + len(paragraph) > chunk_size:
+            yield start, current
+            current = []
+            size = 0
+        if not current:
+            start = offset
+        current.append(paragraph)
+        size += len(paragraph)
+
+    if current:
+        yield start, current
+
+
+def render_paragraphs(paragraphs):
+    """Render the paragraphs of a chunk as HTML."""
+    parts = []
+    for paragraph in paragraphs:
+        paragraph = paragraph.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+        parts.append(f"<p>{'<br>'.join(line.strip() for line in paragraph.splitlines())}</p>")
+    return '\n'.join(parts)
+
+
+def render_fragment(paragraphs, number, has_next, slug):
+    """
+    Render a chunk as a standalone document.
+
+    Args:
+        paragraphs: Paragraphs of the chunk
+        number: Position of the chunk, from 0
+        has_next: Whether another chunk follows
+        slug: The book, for the link back to its page
+    """
+    links = [f'<a href="../../{slug}.html">← Zpět na stránku knihy</a>']
+    if number > 0:
+        links.append(f'<a href="{number - 1:03d}.html">← Předchozí část</a>')
+    if has_next:
+        links.append(f'<a href="{number + 1:03d}.html">Další část →</a>')
+
+    return f"""<!DOCTYPE html>
+<html lang="cs">
+<head>
+<meta charset="UTF-8">
+<meta name="viewport" content="width=device-width, initial-scale=1.0">
+<meta name="robots" content="noindex">
+<title>Plný text – část {number + 1}</title>
+</head>
+<body>
+<main>
+{render_paragraphs(paragraphs)}
+</main>
+<nav>{' | '.join(links)}</nav>
+</body>
+</html>
+"""
+
+
+def _text_version(text_path, chunk_size):
+    digest = hashlib.sha256(f"{READER_VERSION}:{chunk_size}:".encode('utf-8'))
+    with open(text_path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def load_index(chunk_dir):
+    """Load the chunk index of a book, or None if there is none."""
+    try:
+        with open(os.path.join(chunk_dir, INDEX_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_text_chunks(text_path, chunk_dir, chunk_size=CHUNK_SIZE):
+    """
+    Split a text into chunk fragments and write their index.
+
+    Args:
+        text_path: Path to the book's text file
+        chunk_dir: Directory for the fragments and index.json
+        chunk_size: Target chunk size in characters
+
+    Returns:
+        Tuple of (index, True if anything was written)
+    """
+    # Imported here because generate_book_pages imports this module
+    from generate_book_pages import iter_text_file
+
+    version = _text_version(text_path, chunk_size)
+    index = load_index(chunk_dir)
+    if index and index.get('version') == version:
+        return index, False
+
+    os.makedirs(chunk_dir, exist_ok=True)
+
+    length = 0
+
+    def counted(chunks):
+        nonlocal length
+        for chunk in chunks:
+            length += len(chunk)
+            yield chunk
+
+    slug = os.path.splitext(os.path.basename(text_path))[0]
+    entries = []
+    previous = None
+
+    def write_chunk(number, chunk_paragraphs, has_next):
+        with open(os.path.join(chunk_dir, f"{number:03d}.html"), 'w', encoding='utf-8') as f:
+            f.write(render_fragment(chunk_paragraphs, number, has_next, slug))
+
+    # Each chunk is written once the next one is known, for its "next" link
+    paragraphs = iter_paragraphs(counted(iter_text_file(text_path)))
+    for number, (offset, chunk_paragraphs) in enumerate(iter_chunks(paragraphs, chunk_size)):
+        if previous is not None:
+            write_chunk(number - 1, previous, True)
+            entries[-1]['length'] = offset - entries[-1]['offset']
+        entries.append({'file': f"{number:03d}.html", 'offset': offset, 'length': 0})
+        previous = chunk_paragraphs
+
+    if previous is not None:
+        write_chunk(len(entries) - 1, previous, False)
+        entries[-1]['length'] = length - entries[-1]['offset']
+
+    index = {'version': version, 'length': length, 'chunks': entries}
+    index_path = os.path.join(chunk_dir, INDEX_NAME)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=1)
+        f.write('\n')
+    os.replace(tmp_path, index_path)
+
+    # Fragments left over from a longer previous version
+    current = {entry['file'] for entry in entries} | {INDEX_NAME}
+    for name in os.listdir(chunk_dir):
+        if name not in current:
+            os.remove(os.path.join(chunk_dir, name))
+
+    return index, True
+
+
+def has_reader(html_path):
+    """Check whether a book page contains the reader."""
+    try:
+        with open(html_path, 'r', encoding='utf-8') as f:
+            return READER_MARKER in f.read()
+    except OSError:
+        return False
+
+
+def write_book_chunks(text_dir=TEXT_DIR, html_dir=HTML_DIR, slugs=None):
+    """
+    Write the chunks of every book whose page contains the reader.
+
+    Args:
+        text_dir: Directory with the <slug>.txt files
+        html_dir: Directory with the book pages; chunks go to its chunks/
+        slugs: Limit to these books
+
+    Returns:
+        Dictionary with books (with a reader) and written (re-chunked)
+    """
+    if slugs is None:
+        try:
+            slugs = sorted(name[:-len('.txt')] for name in os.listdir(text_dir) if name.endswith('.txt'))
+        except OSError:
+            slugs = []
+
+    books = 0
+    written = 0
+    for slug in slugs:
+        text_path = os.path.join(text_dir, f"{slug}.txt")
+        if not os.path.exists(text_path) or not has_reader(os.path.join(html_dir, f"{slug}.html")):
+            continue
+        books += 1
+        _, changed = write_text_chunks(text_path, os.path.join(html_dir, "chunks", slug))
+        written += changed
+
+    return {'books': books, 'written': written}
+
+
+def main():
+    """Write the reader chunks."""
+
+    slugs = sys.argv[1:] or None
+
+    print("=" * 60)
+    print("Book Reader Chunks")
+    print("=" * 60)
+
+    stats = write_book_chunks(slugs=slugs)
+
+    print(f"  {stats['written']} of {stats['books']} books re-chunked")
+    print(f"  Chunks: {CHUNKS_DIR}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
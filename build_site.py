@@ -0,0 +1,463 @@
+"""
+Staged Site Build for Maturita Portal
+
+Builds the deployable site without touching the live copy:
+
+1. Copies the publishable files of the working tree (pages, assets, JSON,
+   sitemap, reader chunks - no scripts, sources, texts or PDFs) into a new
+   staging directory under .build/
+2. Fingerprints the assets and writes the service worker there, and with
+   --compress the .gz/.br variants
+3. Writes build-manifest.json with the size and hash of every file
+4. Swaps the build in: dist is a symlink to the current build and is
+   replaced in one atomic rename, so dist is always a complete build.
+   A failed build is deleted and dist stays as it was. The previous build
+   is kept for rolling back.
+
+Watch mode (watch_site.py) stages once and then copies only the files an
+edit changed into the live build, see update_build().
+
+Publishing compares the manifest of dist with the manifest of the last
+publish and copies only the files whose hash differs, then removes the
+files that are gone (and directories left empty), so deploy I/O grows
+with the change instead of with the site. The publish manifest is kept
+next to the target (<target>.publish-manifest.json), not inside it, so it
+is never deployed.
+
+Usage:
+    python build_site.py                      build and swap in dist
+    python build_site.py --compress           also precompress text files
+    python build_site.py --publish <target>   build, then publish to target
+
+Requirements:
+    pip install brotli  (optional, for .br variants)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import sys
+import time
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from fingerprint_assets import (ASSETS, MANIFEST_NAME as ASSET_MANIFEST_NAME, SKIP_DIRS, fingerprint_site,
+                                is_fingerprinted_copy, load_manifest as load_asset_manifest, rewrite_references)
+from generate_service_worker import (PRECACHE_EXTENSIONS, PRECACHE_MANIFEST_NAME, SERVICE_WORKER_NAME,
+                                     update_service_worker, write_service_worker)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+BUILD_DIR_NAME = ".build"
+# Skipped by every site walk, see fingerprint_assets.SKIP_DIRS
+LIVE_DIR_NAME = "dist"
+BUILD_MANIFEST_NAME = "build-manifest.json"
+
+# Builds kept in .build/, the live one included
+KEEP_BUILDS = 2
+
+# File types the site consists of
+PUBLISH_EXTENSIONS = PRECACHE_EXTENSIONS | {'.xml', '.gif', '.woff', '.woff2', '.webmanifest'}
+
+# Text files at the root that crawlers and AdSense look for
+PUBLISH_FILES = {'robots.txt', 'ads.txt'}
+
+# Written by the build itself; copies in the working tree are leftovers
+# of in-place runs and are not staged
+BUILD_OUTPUTS = {ASSET_MANIFEST_NAME, PRECACHE_MANIFEST_NAME, SERVICE_WORKER_NAME}
+
+# Precompressed variants: content coding and file suffix, preferred first
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+# Worth precompressing
+COMPRESSIBLE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.svg', '.xml', '.txt'}
+MIN_COMPRESS_SIZE = 512
+
+
+def iter_publish_files(root, staged=False):
+    """
+    Yield the site-relative paths (with /) of the files to deploy.
+
+    Args:
+        root: Working tree, or with staged=True a staged build, whose
+            build outputs and fingerprinted copies belong to the site
+    """
+    for current, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS)
+        for name in sorted(files):
+            relative = os.path.relpath(os.path.join(current, name), root).replace(os.sep, '/')
+            if not is_publishable(relative):
+                continue
+            if staged or (relative not in BUILD_OUTPUTS and not is_fingerprinted_copy(relative)):
+                yield relative
+
+
+def is_publishable(relative):
+    """
+    Check whether a site-relative path (with /) is one of the files to
+    deploy (see iter_publish_files()).
+    """
+    parts = relative.split('/')
+    if any(part.startswith('.') or not part for part in parts) or relative == BUILD_MANIFEST_NAME:
+        return False
+    if any(part in SKIP_DIRS for part in parts[:-1]):
+        return False
+    return os.path.splitext(parts[-1])[1].lower() in PUBLISH_EXTENSIONS or parts[-1] in PUBLISH_FILES
+
+
+def file_hash(path):
+    """SHA-256 of a file, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(65536), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_manifest(root):
+    """
+    Record the size and hash of every file of a build.
+
+    Returns:
+        Dictionary with version (hash over all entries) and files
+        (path -> {'size', 'sha256'})
+    """
+    files = {}
+    for current, dirs, names in os.walk(root):
+        dirs.sort()
+        for name in sorted(names):
+            path = os.path.join(current, name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if relative == BUILD_MANIFEST_NAME:
+                continue
+            files[relative] = {'size': os.path.getsize(path), 'sha256': file_hash(path)}
+
+    return {'version': _manifest_version(files), 'files': files}
+
+
+def _manifest_version(files):
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def publish_manifest_path(target_dir):
+    """Where the manifest of the last publish to a target is kept."""
+    return f"{os.path.normpath(target_dir)}.publish-manifest.json"
+
+
+def write_manifest(root, manifest, path=None):
+    path = path or os.path.join(root, BUILD_MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+        f.write('\n')
+    os.replace(tmp_path, path)
+
+
+def load_build_manifest(root, path=None):
+    """Load build-manifest.json of a directory (or path), or None if there is none."""
+    try:
+        with open(path or os.path.join(root, BUILD_MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def precompress(root):
+    """
+    Write .gz (and, with brotli installed, .br) siblings of the text files
+    of a staged build, reader chunks included.
+
+    Returns:
+        Number of compressed files written
+    """
+    written = 0
+    for relative in iter_publish_files(root, staged=True):
+        path = os.path.join(root, *relative.split('/'))
+        if os.path.splitext(path)[1] not in COMPRESSIBLE_EXTENSIONS:
+            continue
+        if os.path.getsize(path) < MIN_COMPRESS_SIZE:
+            continue
+
+        mtime = os.path.getmtime(path)
+        content = None
+        for encoding, suffix in ENCODINGS:
+            if encoding == 'br' and brotli is None:
+                continue
+            target = path + suffix
+            if os.path.exists(target) and os.path.getmtime(target) >= mtime:
+                continue
+            if content is None:
+                with open(path, 'rb') as f:
+                    content = f.read()
+            if encoding == 'br':
+                data = brotli.compress(content, quality=11)
+            else:
+                data = gzip.compress(content, compresslevel=9, mtime=0)
+            with open(target, 'wb') as f:
+                f.write(data)
+            written += 1
+
+    return written
+
+
+def stage_site(source_root, staging_dir, compress=False):
+    """
+    Build the site into a staging directory.
+
+    Returns:
+        The build manifest
+    """
+    os.makedirs(staging_dir)
+    for relative in iter_publish_files(source_root):
+        target = os.path.join(staging_dir, *relative.split('/'))
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copy2(os.path.join(source_root, *relative.split('/')), target)
+
+    fingerprint_site(staging_dir)
+    write_service_worker(staging_dir)
+    if compress:
+        precompress(staging_dir)
+
+    manifest = build_manifest(staging_dir)
+    write_manifest(staging_dir, manifest)
+    return manifest
+
+
+def swap_in(build_dir, live_dir):
+    """
+    Make live_dir point at build_dir.
+
+    live_dir is a symlink replaced with one rename, so readers see either
+    the old or the new build. Where symlinks are not available (or
+    live_dir is a real directory), the directories are renamed instead.
+    """
+    tmp_link = f"{live_dir}.tmp"
+    try:
+        if os.path.lexists(tmp_link):
+            os.remove(tmp_link)
+        os.symlink(os.path.relpath(build_dir, os.path.dirname(live_dir)), tmp_link, target_is_directory=True)
+    except (OSError, NotImplementedError):
+        tmp_link = None
+
+    if tmp_link and (os.path.islink(live_dir) or not os.path.exists(live_dir)):
+        os.replace(tmp_link, live_dir)
+        return
+
+    if tmp_link:
+        os.remove(tmp_link)
+    old_dir = f"{live_dir}.old"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(live_dir):
+        os.rename(live_dir, old_dir)
+    os.rename(build_dir, live_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def prune_builds(builds_dir, live_dir, keep=KEEP_BUILDS):
+    """Remove all but the newest builds, never the live one."""
+    live = os.path.realpath(live_dir)
+    builds = sorted(os.listdir(builds_dir), reverse=True)
+    for name in builds[keep:]:
+        path = os.path.join(builds_dir, name)
+        if os.path.realpath(path) != live:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def build_site(root=SCRIPT_DIR, compress=False):
+    """
+    Build the site in a staging directory and swap it in as dist.
+
+    Returns:
+        Dictionary with build (directory), files and version
+    """
+    builds_dir = os.path.join(root, BUILD_DIR_NAME)
+    live_dir = os.path.join(root, LIVE_DIR_NAME)
+    # Sorts by time, also for several builds within a second (watch mode)
+    stamp = f"{time.strftime('%Y%m%d-%H%M%S')}.{time.time_ns() % 10**9:09d}"
+    staging_dir = os.path.join(builds_dir, f"{stamp}-{os.getpid()}")
+
+    try:
+        manifest = stage_site(root, staging_dir, compress)
+    except BaseException:
+        # dist keeps serving the previous build
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        raise
+
+    swap_in(staging_dir, live_dir)
+    prune_builds(builds_dir, live_dir)
+    return {'build': staging_dir, 'files': len(manifest['files']), 'version': manifest['version']}
+
+
+def update_build(root=SCRIPT_DIR, paths=()):
+    """
+    Bring the live build up to date with some changed files of the working
+    tree (watch mode), instead of staging the whole site again.
+
+    Only these files are copied, with their asset references rewritten,
+    and hashed; removed ones are deleted. precache-manifest.json, sw.js and
+    build-manifest.json get just their entries updated. The files are
+    replaced one by one in the live build, not swapped in as a whole, and
+    changed files lose their .gz/.br variants until the next full build.
+    An asset change rewrites every page, so it runs build_site(), as does
+    a missing live build.
+
+    Args:
+        root: Working tree
+        paths: Site-relative paths (with /) of the changed files
+
+    Returns:
+        Dictionary with build (directory), files, version and updated
+        (files copied or removed)
+    """
+    build_dir = os.path.realpath(os.path.join(root, LIVE_DIR_NAME))
+    manifest = load_build_manifest(build_dir)
+    asset_manifest = load_asset_manifest(build_dir)
+    paths = sorted(path for path in paths
+                   if is_publishable(path) and path not in BUILD_OUTPUTS and not is_fingerprinted_copy(path))
+
+    if manifest is None or asset_manifest is None or any(path in ASSETS for path in paths):
+        result = build_site(root)
+        result['updated'] = result['files']
+        return result
+
+    hashes = {}
+    for relative in paths:
+        source = os.path.join(root, *relative.split('/'))
+        target = os.path.join(build_dir, *relative.split('/'))
+
+        for _, suffix in ENCODINGS:
+            if manifest['files'].pop(relative + suffix, None) is not None:
+                os.remove(target + suffix)
+
+        if not os.path.exists(source):
+            if manifest['files'].pop(relative, None) is not None:
+                os.remove(target)
+                _remove_empty_dirs(os.path.dirname(target), build_dir)
+            hashes[relative] = None
+            continue
+
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.tmp"
+        shutil.copy2(source, tmp_path)
+        if relative.endswith('.html'):
+            rewrite_references(build_dir, asset_manifest['assets'], [tmp_path])
+        os.replace(tmp_path, target)
+
+        manifest['files'][relative] = {'size': os.path.getsize(target), 'sha256': file_hash(target)}
+        hashes[relative] = manifest['files'][relative]['sha256']
+
+    if hashes and update_service_worker(build_dir, hashes) is not None:
+        for name in (PRECACHE_MANIFEST_NAME, SERVICE_WORKER_NAME):
+            path = os.path.join(build_dir, name)
+            manifest['files'][name] = {'size': os.path.getsize(path), 'sha256': file_hash(path)}
+
+    if hashes:
+        manifest['version'] = _manifest_version(manifest['files'])
+        write_manifest(build_dir, manifest)
+
+    return {'build': build_dir, 'files': len(manifest['files']), 'version': manifest['version'],
+            'updated': len(hashes)}
+
+
+def _copy_file(source, target):
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    shutil.copy2(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+def _remove_empty_dirs(directory, root):
+    """Remove directory and its parents while they are empty, up to root itself."""
+    while os.path.normpath(directory) != os.path.normpath(root):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            break
+        directory = os.path.dirname(directory)
+
+
+def publish(build_dir, target_dir):
+    """
+    Copy a build to a target directory, writing only what changed.
+
+    The manifest at publish_manifest_path() records what was published
+    last. If there is none, the files already in the target are hashed
+    once instead.
+
+    Returns:
+        Dictionary with copied, removed, unchanged and bytes (copied)
+    """
+    manifest = load_build_manifest(build_dir) or build_manifest(build_dir)
+    manifest_path = publish_manifest_path(target_dir)
+    published = load_build_manifest(target_dir, manifest_path)
+    if published is None:
+        published = {'files': {}}
+        for relative in manifest['files']:
+            path = os.path.join(target_dir, *relative.split('/'))
+            if os.path.isfile(path):
+                published['files'][relative] = {'size': os.path.getsize(path), 'sha256': file_hash(path)}
+
+    stats = {'copied': 0, 'removed': 0, 'unchanged': 0, 'bytes': 0}
+
+    for relative, entry in manifest['files'].items():
+        if published['files'].get(relative) == entry:
+            stats['unchanged'] += 1
+            continue
+        _copy_file(os.path.join(build_dir, *relative.split('/')), os.path.join(target_dir, *relative.split('/')))
+        stats['copied'] += 1
+        stats['bytes'] += entry['size']
+
+    # Only files this step published before, never anything else in the target
+    for relative in sorted(published['files'].keys() - manifest['files'].keys()):
+        try:
+            os.remove(os.path.join(target_dir, *relative.split('/')))
+            stats['removed'] += 1
+        except OSError:
+            continue
+        _remove_empty_dirs(os.path.dirname(os.path.join(target_dir, *relative.split('/'))), target_dir)
+
+    # Written last: an interrupted publish is simply redone next time
+    write_manifest(target_dir, manifest, manifest_path)
+    return stats
+
+
+def main():
+    """Build the site and optionally publish it."""
+
+    compress = '--compress' in sys.argv
+    target = None
+    if '--publish' in sys.argv:
+        index = sys.argv.index('--publish')
+        if index + 1 >= len(sys.argv):
+            print("Usage: python build_site.py --publish <target>")
+            sys.exit(1)
+        target = os.path.abspath(sys.argv[index + 1])
+
+    print("=" * 60)
+    print("Staged Site Build")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    stats = build_site(SCRIPT_DIR, compress)
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"  Built {stats['files']} files in {elapsed:.0f} ms (version {stats['version']})")
+    print(f"  Live: {os.path.join(SCRIPT_DIR, LIVE_DIR_NAME)} -> {os.path.relpath(stats['build'], SCRIPT_DIR)}")
+
+    if target:
+        start = time.perf_counter()
+        stats = publish(os.path.join(SCRIPT_DIR, LIVE_DIR_NAME), target)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"  Published to {target} in {elapsed:.0f} ms:")
+        print(f"    {stats['copied']} copied ({stats['bytes'] / 1024:.0f} KB), "
+              f"{stats['removed']} removed, {stats['unchanged']} unchanged")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Internal Link Checker for Maturita Portal
+
+Checks every relative link of the site (the footer and nav links the
+generators write at different depths, book page links, asset links):
+
+1. Parses all HTML files in a worker pool, collecting href/src values and
+   anchor ids
+2. Builds the link graph of the site in memory
+3. Reports dangling links (missing file, missing #anchor, pointing outside
+   the site) and orphan pages that cannot be reached from index.html
+
+Results per file are cached by content hash in .cache/link_check.json, so
+after a small change only the changed files are parsed again.
+
+Usage:
+    python check_links.py [site_root]
+
+Exits with status 1 if there are dangling links.
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from html.parser import HTMLParser
+from urllib.parse import unquote, urlsplit
+
+from fingerprint_assets import iter_html_files
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_PATH = os.path.join(SCRIPT_DIR, ".cache", "link_check.json")
+
+# Bump whenever LinkCollector changes, so cached results are redone
+CHECKER_VERSION = "1"
+
+# Below this many files to parse, a worker pool costs more than it saves
+PARALLEL_FILE_THRESHOLD = 16
+
+# Attributes holding URLs, per tag
+LINK_ATTRIBUTES = {
+    'a': 'href', 'link': 'href', 'area': 'href',
+    'script': 'src', 'img': 'src', 'iframe': 'src', 'source': 'src', 'audio': 'src', 'video': 'src'
+}
+
+# Page every other page should be reachable from
+ENTRY_PAGE = "index.html"
+
+
+class LinkCollector(HTMLParser):
+    """Collect link targets and anchor ids of a page."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.links = []
+        self.ids = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        attribute = LINK_ATTRIBUTES.get(tag)
+        if attribute and attrs.get(attribute):
+            self.links.append(attrs[attribute])
+        if attrs.get('id'):
+            self.ids.append(attrs['id'])
+        if tag == 'a' and attrs.get('name'):
+            self.ids.append(attrs['name'])
+
+    handle_startendtag = handle_starttag
+
+
+def parse_page(content):
+    """
+    Parse one page.
+
+    Args:
+        content: Page HTML as bytes
+
+    Returns:
+        Dictionary with links and ids
+    """
+    collector = LinkCollector()
+    collector.feed(content.decode('utf-8-sig', errors='replace'))
+    collector.close()
+    return {'links': collector.links, 'ids': collector.ids}
+
+
+def _parse_file(path):
+    with open(path, 'rb') as f:
+        return parse_page(f.read())
+
+
+def resolve_link(page, href):
+    """
+    Resolve a link found on a page.
+
+    Args:
+        page: Site-relative path of the page, with /
+        href: Link as written in the page
+
+    Returns:
+        Tuple of (site-relative target path or None if outside the site,
+        fragment), or None for external links (http:, mailto:, ...)
+    """
+    parts = urlsplit(href.strip())
+    if parts.scheme or parts.netloc:
+        return None
+
+    path = unquote(parts.path)
+    if not path:
+        return page, parts.fragment
+
+    if path.startswith('/'):
+        target = posixpath.normpath(path.lstrip('/') or '.')
+    else:
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(page), path))
+
+    if target == '..' or target.startswith('../'):
+        return None, parts.fragment
+    if target == '.' or path.endswith('/'):
+        target = posixpath.join(target, 'index.html') if target != '.' else 'index.html'
+    return target, parts.fragment
+
+
+def load_cache(cache_path=CACHE_PATH):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CHECKER_VERSION:
+            return cache['files']
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}
+
+
+def save_cache(files, cache_path=CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': CHECKER_VERSION, 'files': files}, f)
+    os.replace(tmp_path, cache_path)
+
+
+def scan_pages(root=SCRIPT_DIR, cache_path=CACHE_PATH, max_workers=None):
+    """
+    Parse all pages of the site, reusing cached results of unchanged files.
+
+    Returns:
+        Tuple of (dictionary page -> {'hash', 'links', 'ids'}, number parsed)
+    """
+    cached = load_cache(cache_path)
+    pages = {}
+    to_parse = []
+
+    for path in iter_html_files(root):
+        page = os.path.relpath(path, root).replace(os.sep, '/')
+        with open(path, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        entry = cached.get(page)
+        if entry and entry['hash'] == digest:
+            pages[page] = entry
+        else:
+            to_parse.append((page, path, digest))
+
+    if len(to_parse) >= PARALLEL_FILE_THRESHOLD:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_parse_file, [path for _, path, _ in to_parse], chunksize=8))
+    else:
+        results = [_parse_file(path) for _, path, _ in to_parse]
+
+    for (page, _, digest), result in zip(to_parse, results):
+        pages[page] = {'hash': digest, **result}
+
+    if to_parse or len(pages) != len(cached):
+        save_cache(pages, cache_path)
+    return pages, len(to_parse)
+
+
+def build_link_graph(pages, root=SCRIPT_DIR):
+    """
+    Resolve the links of all pages.
+
+    Args:
+        pages: Output of scan_pages()
+        root: Site directory, for checking non-HTML targets
+
+    Returns:
+        Tuple of (graph: page -> sorted list of linked pages,
+        dangling: list of (page, href, reason))
+    """
+    graph = {}
+    dangling = []
+    existing = {}
+
+    def exists(target):
+        if target in pages:
+            return True
+        if target not in existing:
+            existing[target] = os.path.isfile(os.path.join(root, *target.split('/')))
+        return existing[target]
+
+    for page, entry in pages.items():
+        targets = set()
+        for href in entry['links']:
+            resolved = resolve_link(page, href)
+            if resolved is None:
+                continue
+            target, fragment = resolved
+
+            if target is None:
+                dangling.append((page, href, "points outside the site"))
+                continue
+            if not exists(target):
+                dangling.append((page, href, "missing file"))
+                continue
+
+            if target in pages:
+                if fragment and fragment not in pages[target]['ids']:
+                    dangling.append((page, href, f"missing anchor #{fragment}"))
+                if target != page:
+                    targets.add(target)
+
+        graph[page] = sorted(targets)
+
+    return graph, dangling
+
+
+def find_orphans(graph, entry=ENTRY_PAGE):
+    """
+    Return the pages that cannot be reached from the entry page.
+    """
+    if entry not in graph:
+        return sorted(graph)
+
+    reached = {entry}
+    stack = [entry]
+    while stack:
+        for target in graph.get(stack.pop(), ()):
+            if target not in reached:
+                reached.add(target)
+                stack.append(target)
+
+    return sorted(page for page in graph if page not in reached)
+
+
+def check_site(root=SCRIPT_DIR, cache_path=CACHE_PATH, max_workers=None):
+    """
+    Check all internal links of the site.
+
+    Returns:
+        Dictionary with pages, parsed, links, graph, dangling and orphans
+    """
+    pages, parsed = scan_pages(root, cache_path, max_workers)
+    graph, dangling = build_link_graph(pages, root)
+    return {
+        'pages': len(pages),
+        'parsed': parsed,
+        'links': sum(len(entry['links']) for entry in pages.values()),
+        'graph': graph,
+        'dangling': dangling,
+        'orphans': find_orphans(graph)
+    }
+
+
+def main():
+    """Check the links of the site and print a report."""
+
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+    cache_path = CACHE_PATH if root == SCRIPT_DIR else os.path.join(root, ".cache", "link_check.json")
+
+    start = time.perf_counter()
+    report = check_site(root, cache_path)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    print("=" * 60)
+    print("Internal Link Check")
+    print("=" * 60)
+
+    if report['dangling']:
+        print(f"Dangling links ({len(report['dangling'])}):")
+        for page, href, reason in report['dangling']:
+            print(f"  {page}: {href} ({reason})")
+        print()
+
+    if report['orphans']:
+        print(f"Pages not reachable from {ENTRY_PAGE} ({len(report['orphans'])}):")
+        for page in report['orphans']:
+            print(f"  {page}")
+        print()
+
+    print(f"Pages: {report['pages']} ({report['parsed']} parsed, rest cached), links: {report['links']}")
+    print(f"Checked in {elapsed:.0f} ms")
+    print("=" * 60)
+
+    sys.exit(1 if report['dangling'] else 0)
+
+
+if __name__ == "__main__":
+    main()
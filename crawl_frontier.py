@@ -0,0 +1,163 @@
+"""
+Crawl Frontier for Maturita Portal
+
+Discovers book detail pages on the milujemecestinu.cz catalog listing:
+
+- canonicalizes URLs (absolute, lowercase host, sorted query, no fragment),
+  so the same page linked in different ways is only fetched once
+- dedupes items by their itemid query parameter
+- follows the listing's pagination links, if there are any
+- remembers already scraped items between runs in a JSON state file, so a
+  refresh only fetches catalog items that are new
+
+Used by extract_books_info.py and scrape_books.py. The fetching itself is
+left to the caller, which passes a function returning a BeautifulSoup
+document for a URL.
+"""
+
+import json
+import os
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+BASE_URL = "https://www.milujemecestinu.cz/"
+
+STATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "frontier")
+
+# Query parameters that select a page of a listing
+PAGE_PARAMS = {'page', 'pg', 'p', 'strana', 'start', 'offset', 'from', 'limitstart'}
+
+# Safety limit for listings with broken pagination
+MAX_LISTING_PAGES = 200
+
+
+def canonicalize_url(href, base=BASE_URL):
+    """
+    Turn a link into a canonical absolute URL.
+
+    Variants of the same URL (relative links, different query parameter
+    order, fragments, empty parameters) map to the same string.
+    """
+    scheme, netloc, path, query, _ = urlsplit(urljoin(base, href.strip()))
+    params = sorted((key, value) for key, value in parse_qsl(query, keep_blank_values=True) if value)
+    return urlunsplit((scheme.lower(), netloc.lower(), path or '/', urlencode(params), ''))
+
+
+def item_key(url):
+    """
+    Return the identity of a catalog item: its itemid, or the canonical URL.
+    """
+    params = dict(parse_qsl(urlsplit(url).query))
+    if params.get('itemid'):
+        return f"itemid:{params['itemid']}"
+    return canonicalize_url(url)
+
+
+def _listing_params(url):
+    """Query parameters of a listing URL, without the page selector."""
+    return {key: value for key, value in parse_qsl(urlsplit(url).query) if key.lower() not in PAGE_PARAMS}
+
+
+def is_pagination_link(url, listing_url):
+    """
+    Check whether a canonical URL is another page of the same listing.
+    """
+    link, listing = urlsplit(url), urlsplit(listing_url)
+    if (link.netloc, link.path) != (listing.netloc, listing.path):
+        return False
+    if not any(key.lower() in PAGE_PARAMS for key, _ in parse_qsl(link.query)):
+        return False
+    return _listing_params(url) == _listing_params(listing_url)
+
+
+def iter_listing_pages(start_url, fetch, max_pages=MAX_LISTING_PAGES):
+    """
+    Yield (url, soup) for the listing page and every page it paginates to.
+
+    Args:
+        start_url: First page of the listing
+        fetch: Function returning a BeautifulSoup document for a URL
+        max_pages: Stop after this many listing pages
+    """
+    start_url = canonicalize_url(start_url)
+    queue = [start_url]
+    queued = {start_url}
+    fetched = 0
+
+    while queue and fetched < max_pages:
+        url = queue.pop(0)
+        soup = fetch(url)
+        fetched += 1
+        if soup is None:
+            continue
+
+        yield url, soup
+
+        for link in soup.find_all('a', href=True):
+            page_url = canonicalize_url(link['href'], url)
+            if page_url not in queued and is_pagination_link(page_url, start_url):
+                queued.add(page_url)
+                queue.append(page_url)
+
+
+def discover_items(start_url, fetch, is_item_link, seen=None):
+    """
+    Collect the catalog items on a listing that have not been seen yet.
+
+    Args:
+        start_url: First page of the listing
+        fetch: Function returning a BeautifulSoup document for a URL
+        is_item_link: Function deciding from a raw href whether it is an item
+        seen: Keys (see item_key()) of items to skip
+
+    Returns:
+        List of dictionaries with url, key and title, one per item
+    """
+    seen = seen or {}
+    items = {}
+
+    for page_url, soup in iter_listing_pages(start_url, fetch):
+        for link in soup.find_all('a', href=True):
+            href = link['href']
+            if not is_item_link(href):
+                continue
+
+            url = canonicalize_url(href, page_url)
+            key = item_key(url)
+            if key in seen:
+                continue
+
+            title = link.get_text(strip=True)
+            if key not in items:
+                items[key] = {'url': url, 'key': key, 'title': title}
+            elif not items[key]['title']:
+                # Image links come first on some pages, keep the text title
+                items[key]['title'] = title
+
+    return list(items.values())
+
+
+def load_seen(state_name, state_dir=STATE_DIR):
+    """
+    Load the items remembered from previous runs.
+
+    Returns:
+        Dictionary of item key -> scraped data (empty on the first run)
+    """
+    path = os.path.join(state_dir, f"{state_name}.json")
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_seen(state_name, seen, state_dir=STATE_DIR):
+    """
+    Save the scraped items so the next run can skip them.
+    """
+    os.makedirs(state_dir, exist_ok=True)
+    path = os.path.join(state_dir, f"{state_name}.json")
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(seen, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
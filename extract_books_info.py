@@ -1,33 +1,45 @@
-import requests
 from bs4 import BeautifulSoup
 import time
-import re
+import sys
 
-def get_book_links(main_url):
-    """Extract all book detail page links from the main page"""
-    print("Fetching book links from main page...")
-    response = requests.get(main_url)
-    soup = BeautifulSoup(response.content, 'html.parser')
+import http_cassette
+from book_page_parser import find_label, parse_detail_page
+from crawl_frontier import discover_items, item_key, load_seen, save_seen
+
+# Name of the crawl state file that remembers scraped books
+STATE_NAME = "extract_books_info"
+
+def fetch_soup(url):
+    """Fetch a page and parse it with BeautifulSoup"""
+    response = http_cassette.get(url)
+    return BeautifulSoup(response.content, 'html.parser')
+
+def get_book_links(main_url, seen=None):
+    """Extract all new book detail page links from the listing pages"""
+    print("Fetching book links from listing pages...")
     
-    # Find all links that point to book detail pages
-    book_links = []
-    for link in soup.find_all('a', href=True):
-        href = link['href']
-        if 'mod=mod-tournaments3' in href and 'spec=detail' in href:
-            # Make sure it's a full URL
-            if not href.startswith('http'):
-                href = 'https://www.milujemecestinu.cz/' + href.lstrip('/')
-            book_links.append(href)
+    # Links are canonicalized, deduped by itemid and followed across pagination;
+    # items scraped in earlier runs are skipped
+    items = discover_items(
+        main_url,
+        fetch_soup,
+        lambda href: 'mod=mod-tournaments3' in href and 'spec=detail' in href,
+        seen
+    )
+    book_links = [item['url'] for item in items]
     
-    print(f"Found {len(book_links)} book links")
+    print(f"Found {len(book_links)} new book links")
     return book_links
 
 def extract_book_info(detail_url):
     """Extract book information from a detail page"""
     try:
         print(f"Processing: {detail_url}")
-        response = requests.get(detail_url)
-        soup = BeautifulSoup(response.content, 'html.parser')
+        response = http_cassette.get(detail_url)
+        response.raise_for_status()
+        
+        # Title, links, table rows and text are collected in a single pass
+        page = parse_detail_page(response.content)
         
         # Initialize variables
         title = "Unknown"
@@ -36,15 +48,11 @@ def extract_book_info(detail_url):
         pdf_url = None
         
         # Try to extract the title - usually in <h1> or <h2>
-        title_tag = soup.find('h1')
-        if not title_tag:
-            title_tag = soup.find('h2')
-        if title_tag:
-            title = title_tag.get_text().strip()
+        if page['title']:
+            title = page['title']
         
         # Look for PDF links
-        for link in soup.find_all('a', href=True):
-            href = link['href']
+        for href in page['links']:
             if '.pdf' in href.lower():
                 pdf_url = href
                 if not pdf_url.startswith('http'):
@@ -53,24 +61,14 @@ def extract_book_info(detail_url):
         
         # Try to find author and genre in the page content
         # Look for common patterns like "Autor:", "Žánr:", etc.
-        text_content = soup.get_text()
-        
-        # Extract author
-        author_match = re.search(r'(?:Autor|autor|AUTOR):\s*([^\n]+)', text_content)
-        if author_match:
-            author = author_match.group(1).strip()
-        
-        # Extract genre
-        genre_match = re.search(r'(?:Žánr|žánr|ŽÁNR|Druh|druh):\s*([^\n]+)', text_content)
-        if genre_match:
-            genre = genre_match.group(1).strip()
+        author = find_label(page['text'], [r'(?:Autor|autor|AUTOR):\s*([^\n]+)']) or author
+        genre = find_label(page['text'], [r'(?:Žánr|žánr|ŽÁNR|Druh|druh):\s*([^\n]+)']) or genre
         
         # Look for table rows that might contain this info
-        for row in soup.find_all('tr'):
-            cells = row.find_all(['td', 'th'])
+        for cells in page['rows']:
             if len(cells) >= 2:
-                key = cells[0].get_text().strip().lower()
-                value = cells[1].get_text().strip()
+                key = cells[0].lower()
+                value = cells[1]
                 
                 if 'autor' in key:
                     author = value
@@ -91,20 +89,29 @@ def main():
     main_url = "https://www.milujemecestinu.cz/index.php?mnu=rozbory-literarnich-del&lid=cs&mod=mod-tournaments3&shw=preview"
     output_file = "books_info.txt"
     
-    # Get all book links
-    book_links = get_book_links(main_url)
+    # Books scraped in earlier runs; pass --full to scrape everything again
+    seen = {} if '--full' in sys.argv else load_seen(STATE_NAME)
     
-    # Extract information from each book
-    books_data = []
+    # Get all new book links
+    book_links = get_book_links(main_url, seen)
+    
+    # Extract information from each new book
     for i, link in enumerate(book_links, 1):
         print(f"\nProcessing book {i}/{len(book_links)}")
         info = extract_book_info(link)
+        # Failed pages and pages without a PDF are not remembered, so the
+        # next run tries them again
         if info and info['pdf_url']:
-            books_data.append(info)
+            seen[item_key(link)] = info
+            save_seen(STATE_NAME, seen)
+        else:
+            print("Skipped, will be retried on the next run")
         
         # Be polite to the server - wait a bit between requests
         time.sleep(0.5)
     
+    books_data = [info for info in seen.values() if info['pdf_url']]
+    
     # Write to file
     print(f"\nWriting {len(books_data)} books to {output_file}")
     with open(output_file, 'w', encoding='utf-8') as f:
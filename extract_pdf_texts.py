@@ -9,24 +9,12 @@ Requirements:
 """
 
 import os
-import re
 import sys
 from urllib.parse import unquote
 
-# Check for required packages
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
-
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    print("Installing PyPDF2...")
-    os.system("pip install pypdf2")
-    from PyPDF2 import PdfReader
+from extraction_cache import cached_extract_text
+from extraction_workers import supervised_extract_text
+import http_cassette
 
 # PDF URLs with book information
 BOOKS = [
@@ -91,7 +79,7 @@ def download_pdf(url: str, output_path: str) -> bool:
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_cassette.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         with open(output_path, 'wb') as f:
@@ -116,20 +104,9 @@ def extract_text_from_pdf(pdf_path: str) -> str:
         Extracted text content
     """
     try:
-        reader = PdfReader(pdf_path)
-        text_parts = []
-        
-        for i, page in enumerate(reader.pages):
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        
-        full_text = "\n\n".join(text_parts)
-        
-        # Clean up the text
-        full_text = re.sub(r'\n{3,}', '\n\n', full_text)  # Remove excessive newlines
-        full_text = re.sub(r' {2,}', ' ', full_text)  # Remove excessive spaces
-        
+        # Identical PDFs are only parsed once, whatever their slug; parsing
+        # runs in a supervised worker with time and memory limits
+        full_text, _ = cached_extract_text(pdf_path, extract=supervised_extract_text)
         return full_text
         
     except Exception as e:
@@ -2,13 +2,16 @@
 PDF URL Extractor for Maturita Portal
 
 This script extracts PDF URLs from text input and saves them to a structured text file.
-The URLs are parsed to extract book titles and author names for use in the portal.
+The URLs are parsed to extract book titles and author names for use in the portal,
+using the author gazetteer built from the scraped catalog (author_gazetteer.py).
 """
 
 import re
 import os
 from urllib.parse import unquote
 
+from author_gazetteer import build_gazetteer, match_author, tokenize
+
 # PDF URLs provided
 PDF_URLS = [
     "https://www.milujemecestinu.cz/files/tournaments/112/Zdenek_Jirotka_Saturnin.pdf",
@@ -21,16 +24,39 @@ PDF_URLS = [
 ]
 
 
-def extract_info_from_url(url: str) -> dict:
+def _match_title_suffix(keys, titles):
+    """
+    Find the longest run of trailing keys that spells a known catalog title.
+
+    Returns:
+        Tuple of (display title, index where the title starts), or (None, len(keys))
+    """
+    for start in range(1, len(keys)):
+        folded = " ".join(key for key in keys[start:] if key)
+        if folded in titles:
+            return titles[folded], start
+    return None, len(keys)
+
+
+def extract_info_from_url(url: str, gazetteer: dict = None) -> dict:
     """
     Extract author name and book title from PDF URL.
     
+    The author is the longest known author name the filename starts with
+    (see author_gazetteer.py). Without a match, a known title at the end of
+    the filename, an explicit " - " separator or the first two words are
+    used instead, with a lower confidence.
+    
     Args:
         url: The PDF URL to parse
+        gazetteer: Result of build_gazetteer(); built from the catalog if None
         
     Returns:
-        Dictionary with url, filename, author, title, and slug
+        Dictionary with url, filename, author, title, slug and confidence (0-1)
     """
+    if gazetteer is None:
+        gazetteer = build_gazetteer()
+    
     # Get the filename from URL
     filename = url.split("/")[-1]
     
@@ -47,75 +73,87 @@ def extract_info_from_url(url: str) -> dict:
     name_part = re.sub(r'\s+', ' ', name_part).strip()
     name_part = re.sub(r'\s*-\s*', ' - ', name_part)
     
-    # Try to split author and title
-    # Common patterns: "Author Title", "Author - Title"
-    if " - " in name_part:
+    # One match key per word, "" for separators such as "-"
+    words = name_part.split()
+    keys = [" ".join(tokenize(word)) for word in words]
+    
+    author_name, author_end = match_author(
+        [token for key in keys for token in (key.split() or [""])],
+        gazetteer['authors']
+    )
+    # Convert the token count back to a word count
+    if author_name:
+        consumed = 0
+        for count, key in enumerate(keys, 1):
+            consumed += len(key.split()) or 1
+            if consumed >= author_end:
+                author_end = count
+                break
+    
+    title_name, title_start = _match_title_suffix(keys, gazetteer['titles'])
+    
+    if author_name and any(keys[author_end:]):
+        # Known author at the start, the rest is the title
+        author = author_name
+        title_words = words[author_end:]
+        confidence = 0.8
+    elif title_name and any(keys[:title_start]):
+        # Known title at the end, the rest is the author
+        author = " ".join(word for word in words[:title_start]).strip(" -")
+        title_words = words[title_start:]
+        confidence = 0.7
+    elif " - " in name_part:
         parts = name_part.split(" - ", 1)
         author = parts[0].strip()
-        title = parts[1].strip()
+        title_words = parts[1].split()
+        confidence = 0.5
     else:
-        # Try to intelligently split based on common patterns
-        # This is a simplified approach
-        words = name_part.split()
-        
-        # Known book titles at the end
-        known_titles = {
-            "Saturnin": -1,
-            "Lakomec": -1,
-            "Gatsby": -2,  # "Velky Gatsby"
-        }
-        
-        # Find where author ends and title begins
-        author_words = []
-        title_words = []
-        found_title = False
-        
-        for i, word in enumerate(words):
-            if not found_title:
-                # Check if this could be start of title
-                if word[0].isupper() and i > 1:
-                    # Could be title start - check if previous words were all name parts
-                    if any(key.lower() in word.lower() for key in ['Saturnin', 'R.', 'Gatsby', 'Lakomec', 'Na', 'O', 'Maly']):
-                        found_title = True
-                        title_words.append(word)
-                    else:
-                        author_words.append(word)
-                else:
-                    author_words.append(word)
-            else:
-                title_words.append(word)
-        
-        # If we didn't find a split, make a guess
-        if not title_words:
-            # Assume last 1-3 words are the title
-            if len(words) > 3:
-                author_words = words[:-2]
-                title_words = words[-2:]
-            elif len(words) > 2:
-                author_words = words[:-1]
-                title_words = words[-1:]
-            else:
-                author_words = words[:1]
-                title_words = words[1:]
-        
-        author = " ".join(author_words)
-        title = " ".join(title_words)
+        # Most filenames start with "Firstname Lastname"
+        split_at = 2 if len(words) > 2 else 1
+        author = " ".join(words[:split_at])
+        title_words = words[split_at:]
+        confidence = 0.2
+    
+    # Drop separators left between author and title
+    while title_words and not tokenize(title_words[0]):
+        title_words = title_words[1:]
+    title = " ".join(title_words)
+    
+    # A title that is also in the catalog confirms the split
+    folded_title = " ".join(tokenize(title))
+    if folded_title in gazetteer['titles']:
+        title = gazetteer['titles'][folded_title]
+        confidence = min(1.0, confidence + 0.2)
     
     # Generate slug for file naming
-    slug = title.lower()
-    slug = re.sub(r'[^a-z0-9\s]', '', slug)
-    slug = slug.replace(" ", "-")
-    slug = re.sub(r'-+', '-', slug)
+    slug = "-".join(tokenize(title))
     
     return {
         "url": url,
         "filename": filename,
         "author": author,
         "title": title,
-        "slug": slug
+        "slug": slug,
+        "confidence": round(confidence, 2)
     }
 
 
+def split_urls(urls: list, gazetteer: dict = None) -> list:
+    """
+    Split many PDF URLs at once, building the gazetteer only once.
+    
+    Args:
+        urls: PDF URLs to parse
+        gazetteer: Result of build_gazetteer(); built from the catalog if None
+        
+    Returns:
+        List of extract_info_from_url() results, in input order
+    """
+    if gazetteer is None:
+        gazetteer = build_gazetteer()
+    return [extract_info_from_url(url, gazetteer) for url in urls]
+
+
 def main():
     """Main function to process URLs and generate output file."""
     
@@ -127,34 +165,40 @@ def main():
     print("=" * 60)
     print()
     
-    books = []
+    books = split_urls(PDF_URLS)
     
-    for url in PDF_URLS:
-        info = extract_info_from_url(url)
-        books.append(info)
+    for info in books:
         print(f"📚 {info['title']}")
         print(f"   Author: {info['author']}")
         print(f"   Slug: {info['slug']}")
-        print(f"   URL: {url}")
+        print(f"   Confidence: {info['confidence']:.0%}")
+        print(f"   URL: {info['url']}")
         print()
     
     # Write to output file
     with open(output_file, "w", encoding="utf-8") as f:
         f.write("# Book URLs for Maturita Portal\n")
         f.write("# Generated by extract_urls.py\n")
-        f.write("# Format: title | author | slug | url\n")
+        f.write("# Format: title | author | slug | confidence | url\n")
         f.write("=" * 80 + "\n\n")
         
         for book in books:
             f.write(f"Title: {book['title']}\n")
             f.write(f"Author: {book['author']}\n")
             f.write(f"Slug: {book['slug']}\n")
+            f.write(f"Confidence: {book['confidence']:.2f}\n")
             f.write(f"Filename: {book['filename']}\n")
             f.write(f"URL: {book['url']}\n")
             f.write("-" * 40 + "\n\n")
     
     print("=" * 60)
     print(f"✅ Extracted {len(books)} book URLs")
+    
+    uncertain = [book for book in books if book['confidence'] < 0.5]
+    if uncertain:
+        print(f"⚠️  {len(uncertain)} uncertain splits, please check:")
+        for book in uncertain:
+            print(f"   {book['filename']} -> {book['author']} | {book['title']}")
     print(f"📄 Output saved to: {output_file}")
     print("=" * 60)
     
@@ -0,0 +1,169 @@
+"""
+Extraction Cache for Maturita Portal
+
+Caches extracted PDF text by the SHA-256 of the PDF bytes, so the same
+PDF is parsed at most once no matter which URL it came from or which slug
+it is saved under. Each entry stores the cleaned-up text, the page count
+and the extractor version (backend plus cleanup version); entries made
+by another extractor are ignored.
+
+The cache is limited in size: when it grows past MAX_CACHE_BYTES, the
+least recently used entries are removed.
+
+Run it directly to show cache statistics and apply the size limit.
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from pdf_extract import extract_text, extractor_version
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "extractions")
+
+# Total size of all cache entries before the oldest ones are evicted
+MAX_CACHE_BYTES = 200 * 1024 * 1024
+
+
+def file_sha256(path, block_size=1024 * 1024):
+    """
+    Compute the SHA-256 hex digest of a file's contents.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _entry_path(digest, cache_dir):
+    return os.path.join(cache_dir, f"{digest}.json")
+
+
+def load_entry(digest, cache_dir=CACHE_DIR):
+    """
+    Look up a cached extraction.
+
+    Returns:
+        Dictionary with sha256, text, page_count and extractor_version,
+        or None if missing or made by a different extractor version
+    """
+    path = _entry_path(digest, cache_dir)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if entry.get('extractor_version') != extractor_version():
+        return None
+
+    # Mark as recently used for eviction
+    os.utime(path)
+    return entry
+
+
+def store_entry(digest, text, page_count, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Save an extraction result to the cache and apply the size limit.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entry = {
+        'sha256': digest,
+        'page_count': page_count,
+        'extractor_version': extractor_version(),
+        'text': text
+    }
+
+    # Write to a temporary file first so readers never see half an entry
+    path = _entry_path(digest, cache_dir)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+    evict(cache_dir, max_bytes)
+
+
+def evict(cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+    """
+    Remove least recently used entries until the cache fits in max_bytes.
+
+    Returns:
+        Number of removed entries
+    """
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    entries = []
+    for entry in os.scandir(cache_dir):
+        if entry.name.endswith('.json'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def cached_extract_text(pdf_path, cache_dir=CACHE_DIR, extract=extract_text):
+    """
+    Extract the text of a PDF, reusing a cached result for identical PDFs.
+
+    Args:
+        pdf_path: Path to the PDF file
+        cache_dir: Cache directory
+        extract: Function(pdf_path) -> (text, page_count) used on a miss,
+                 e.g. extraction_workers.supervised_extract_text
+
+    Returns:
+        Tuple of (text, page_count)
+    """
+    digest = file_sha256(pdf_path)
+
+    entry = load_entry(digest, cache_dir)
+    if entry is not None:
+        return entry['text'], entry['page_count']
+
+    text, page_count = extract(pdf_path)
+    if text:
+        store_entry(digest, text, page_count, cache_dir)
+
+    return text, page_count
+
+
+def main():
+    """Show cache statistics and apply the size limit."""
+
+    max_bytes = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else MAX_CACHE_BYTES
+    removed = evict(CACHE_DIR, max_bytes)
+
+    entries = []
+    if os.path.isdir(CACHE_DIR):
+        entries = [e for e in os.scandir(CACHE_DIR) if e.name.endswith('.json')]
+    total = sum(e.stat().st_size for e in entries)
+
+    print("=" * 60)
+    print("Extraction Cache")
+    print("=" * 60)
+    print(f"  Directory: {CACHE_DIR}")
+    print(f"  Entries: {len(entries)}")
+    print(f"  Size: {total / (1024 * 1024):.1f} MB of {max_bytes / (1024 * 1024):.0f} MB")
+    print(f"  Evicted: {removed}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
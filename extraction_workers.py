@@ -0,0 +1,339 @@
+"""
+Supervised PDF Extraction Workers for Maturita Portal
+
+Runs PDF text extraction in separate worker processes, so a malformed or
+huge PDF cannot stall or exhaust a bulk run:
+
+1. Every document gets a wall-clock limit (TIMEOUT seconds); a worker that
+   takes longer is killed
+2. The worker's resident memory is checked while it works; a worker above
+   MAX_RSS_MB is killed
+3. A worker is replaced after MAX_DOCUMENTS_PER_WORKER documents, so
+   memory the PDF libraries keep does not pile up
+4. A PDF that timed out, ran out of memory or crashed its worker is
+   quarantined by its SHA-256 in .cache/quarantine.json and refused
+   right away next time, also when downloaded again under another name
+
+Errors the PDF library raises normally are reported back without
+quarantining. Inside a worker a document is extracted page by page
+without the page-range pool of pdf_extract.py, so a killed worker leaves
+no processes behind; bulk runs use several workers instead.
+
+Memory is read with psutil if installed, otherwise from /proc (Linux);
+without either only the time limit applies.
+
+Usage:
+    python extraction_workers.py [workers]    extract literatura/pdfs
+    python extraction_workers.py --clear      release quarantined PDFs
+"""
+
+import atexit
+import datetime
+import json
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import wait
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+from extraction_cache import file_sha256, load_entry, store_entry
+from pdf_extract import extract_text
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+QUARANTINE_PATH = os.path.join(SCRIPT_DIR, ".cache", "quarantine.json")
+
+# Wall-clock limit per document, in seconds
+TIMEOUT = 120
+
+# Resident memory limit per worker
+MAX_RSS_MB = 1024
+
+# Documents a worker extracts before it is replaced
+MAX_DOCUMENTS_PER_WORKER = 20
+
+# How often busy workers are checked, in seconds
+CHECK_INTERVAL = 0.1
+
+
+class ExtractionError(Exception):
+    """A document could not be extracted."""
+
+
+class QuarantinedError(ExtractionError):
+    """A document is quarantined and was not extracted."""
+
+
+def _worker_main(conn, backend):
+    """Extract the documents sent over conn until told to stop."""
+    while True:
+        try:
+            pdf_path = conn.recv()
+        except EOFError:
+            break
+        if pdf_path is None:
+            break
+        try:
+            text, page_count = extract_text(pdf_path, max_workers=1, backend=backend)
+            conn.send(('ok', text, page_count))
+        except Exception as e:
+            conn.send(('error', f"{type(e).__name__}: {e}", 0))
+    conn.close()
+
+
+def process_rss(pid):
+    """
+    Resident memory of a process in bytes, or None if it cannot be read.
+    """
+    if psutil is not None:
+        try:
+            return psutil.Process(pid).memory_info().rss
+        except psutil.Error:
+            return None
+    try:
+        with open(f"/proc/{pid}/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def load_quarantine(quarantine_path=QUARANTINE_PATH):
+    """Load the quarantined documents: sha256 -> {'path', 'reason', 'date'}."""
+    try:
+        with open(quarantine_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_quarantine(quarantine, quarantine_path=QUARANTINE_PATH):
+    os.makedirs(os.path.dirname(quarantine_path), exist_ok=True)
+    tmp_path = f"{quarantine_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(quarantine, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, quarantine_path)
+
+
+class ExtractionWorker:
+    """One worker process and the document it is working on."""
+
+    def __init__(self, backend=None):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_main, args=(child_conn, backend), daemon=True)
+        self.process.start()
+        child_conn.close()
+        self.documents = 0
+        self.job = None
+        self.deadline = None
+
+    def send(self, job, timeout):
+        self.job = job
+        self.deadline = time.monotonic() + timeout
+        self.documents += 1
+        self.conn.send(job[1])
+
+    def stop(self):
+        """Let the worker finish and exit."""
+        try:
+            self.conn.send(None)
+        except OSError:
+            pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.kill()
+        self.conn.close()
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class ExtractionSupervisor:
+    """
+    Hands documents to worker processes and enforces the limits.
+
+    Use as a context manager, or call close() when done.
+    """
+
+    def __init__(self, workers=1, timeout=TIMEOUT, max_rss_mb=MAX_RSS_MB,
+                 max_documents=MAX_DOCUMENTS_PER_WORKER, quarantine_path=QUARANTINE_PATH, backend=None):
+        self.max_workers = max(1, workers)
+        self.timeout = timeout
+        self.max_rss = max_rss_mb * 1024 * 1024
+        self.max_documents = max_documents
+        self.quarantine_path = quarantine_path
+        self.backend = backend
+        self.idle = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        for worker in self.idle:
+            worker.stop()
+        self.idle = []
+
+    def _quarantine(self, digest, pdf_path, reason):
+        quarantine = load_quarantine(self.quarantine_path)
+        quarantine[digest] = {
+            'path': pdf_path,
+            'reason': reason,
+            'date': datetime.datetime.now().isoformat(timespec='seconds')
+        }
+        save_quarantine(quarantine, self.quarantine_path)
+
+    def _check(self, worker):
+        """Return the reason to kill a busy worker, or None."""
+        if time.monotonic() > worker.deadline:
+            return f"timed out after {self.timeout} s"
+        rss = process_rss(worker.process.pid)
+        if rss is not None and rss > self.max_rss:
+            return f"used {rss // (1024 * 1024)} MB of memory (limit {self.max_rss // (1024 * 1024)} MB)"
+        return None
+
+    def extract_many(self, pdf_paths):
+        """
+        Extract documents in the workers.
+
+        Yields:
+            Tuples of (pdf_path, result) in completion order; result is
+            (text, page_count) or an ExtractionError
+        """
+        quarantine = load_quarantine(self.quarantine_path)
+        pending = []
+        for pdf_path in pdf_paths:
+            digest = file_sha256(pdf_path)
+            if digest in quarantine:
+                yield pdf_path, QuarantinedError(f"quarantined: {quarantine[digest]['reason']}")
+            else:
+                pending.append((digest, pdf_path))
+        pending.reverse()
+
+        busy = []
+        try:
+            while pending or busy:
+                while pending and len(busy) < self.max_workers:
+                    worker = self.idle.pop() if self.idle else ExtractionWorker(self.backend)
+                    worker.send(pending.pop(), self.timeout)
+                    busy.append(worker)
+
+                ready = wait([worker.conn for worker in busy], timeout=CHECK_INTERVAL)
+
+                for worker in list(busy):
+                    digest, pdf_path = worker.job
+                    reason = None
+                    result = None
+
+                    if worker.conn in ready:
+                        try:
+                            status, value, page_count = worker.conn.recv()
+                            result = (value, page_count) if status == 'ok' else ExtractionError(value)
+                        except (EOFError, OSError):
+                            worker.process.join(timeout=1)
+                            reason = f"crashed the worker (exit code {worker.process.exitcode})"
+                    else:
+                        reason = self._check(worker)
+                        if reason is None:
+                            continue
+
+                    busy.remove(worker)
+                    if reason is not None:
+                        worker.kill()
+                        self._quarantine(digest, pdf_path, reason)
+                        result = QuarantinedError(reason)
+                    elif worker.documents >= self.max_documents:
+                        worker.stop()
+                    else:
+                        self.idle.append(worker)
+
+                    yield pdf_path, result
+        finally:
+            # Interrupted: the documents in progress are abandoned
+            for worker in busy:
+                worker.kill()
+
+    def extract(self, pdf_path):
+        """
+        Extract one document.
+
+        Returns:
+            Tuple of (text, page_count)
+
+        Raises:
+            ExtractionError: The document failed, timed out, ran out of
+                memory or is quarantined
+        """
+        for _, result in self.extract_many([pdf_path]):
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+
+_default_supervisor = None
+
+
+def supervised_extract_text(pdf_path):
+    """
+    Extract a PDF in the shared worker (see ExtractionSupervisor.extract()).
+
+    The worker is started on first use and stays up for the next document.
+    """
+    global _default_supervisor
+    if _default_supervisor is None:
+        _default_supervisor = ExtractionSupervisor()
+        atexit.register(_default_supervisor.close)
+    return _default_supervisor.extract(pdf_path)
+
+
+def main():
+    """Extract all PDFs in literatura/pdfs in supervised workers."""
+
+    if '--clear' in sys.argv:
+        quarantine = load_quarantine()
+        save_quarantine({})
+        print(f"Released {len(quarantine)} quarantined PDFs")
+        return
+
+    pdf_dir = os.path.join(SCRIPT_DIR, "literatura", "pdfs")
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count() or 1
+    pdf_paths = sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.endswith('.pdf'))
+
+    print("=" * 70)
+    print(f"Supervised PDF Extraction ({workers} workers, {TIMEOUT} s / {MAX_RSS_MB} MB per document)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    failed = 0
+    with ExtractionSupervisor(workers=workers) as supervisor:
+        # Cached documents never reach a worker
+        missing = [pdf_path for pdf_path in pdf_paths if load_entry(file_sha256(pdf_path)) is None]
+
+        for pdf_path, result in supervisor.extract_many(missing):
+            name = os.path.basename(pdf_path)
+            if isinstance(result, Exception):
+                failed += 1
+                print(f"  ✗ {name}: {result}")
+            else:
+                if result[0]:
+                    store_entry(file_sha256(pdf_path), result[0], result[1])
+                print(f"  ✓ {name}: {result[1]} pages")
+
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(pdf_paths)} PDFs ({len(pdf_paths) - len(missing)} cached), "
+          f"{failed} failed, {elapsed:.1f} s")
+    quarantine = load_quarantine()
+    if quarantine:
+        print(f"Quarantined: {len(quarantine)} (see {QUARANTINE_PATH})")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Asset Fingerprinting for Maturita Portal
+
+Gives the shared assets content-addressed file names, so they can be served
+with a long cache lifetime and still never be stale after a change:
+
+1. Hashes styles.css and script.js and writes copies named after the hash
+   (styles.<hash>.css, script.<hash>.js); outdated copies are removed
+2. Rewrites every reference in all HTML files (hand-written and generated,
+   at any depth) to the fingerprinted name in a single pass per file
+3. Writes asset-manifest.json with the original -> fingerprinted mapping,
+   hashes and the Cache-Control values the server should send
+
+styles.css and script.js stay the files to edit; rerun the script after
+changing them. Generators may keep writing the plain names, the next run
+fingerprints them too.
+
+Usage:
+    python fingerprint_assets.py [site_root]
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Shared assets at the site root
+ASSETS = ['styles.css', 'script.js']
+
+MANIFEST_NAME = "asset-manifest.json"
+
+# Hex digits of the content hash in the file name
+HASH_LENGTH = 10
+
+# Fingerprinted files never change, everything else must be revalidated
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Directories of the working tree that are not part of the site: tooling,
+# test fixtures, sources, and the staged build (dist is a real directory,
+# not a symlink, where symlinks are not available). Every script walking
+# the site uses this.
+SKIP_DIRS = {'__pycache__', 'node_modules', 'fixtures', 'pdfs', 'text', 'topics', 'dist', 'dist.old', 'dist.tmp'}
+
+# The reader chunks (see book_reader.py) are published, but they are not
+# pages: nothing to fingerprint or link-check, too many to precache
+PAGE_SKIP_DIRS = SKIP_DIRS | {'chunks'}
+
+
+def fingerprinted_name(asset, digest):
+    """styles.css + digest -> styles.<hash>.css"""
+    stem, ext = os.path.splitext(asset)
+    return f"{stem}.{digest[:HASH_LENGTH]}{ext}"
+
+
+def _reference_pattern(assets):
+    """
+    Regex for an href/src value pointing at one of the assets, fingerprinted
+    or not, e.g. "../../styles.css" or "script.0123456789.js?v=2".
+    """
+    names = '|'.join(
+        re.escape(os.path.splitext(asset)[0]) + rf'(?:\.[0-9a-f]{{{HASH_LENGTH}}})?' + re.escape(os.path.splitext(asset)[1])
+        for asset in assets
+    )
+    return re.compile(
+        r'''(?P<attr>\b(?:href|src)=["'])(?P<prefix>(?:\./|\.\./)*|/)(?P<name>''' + names + r''')(?:\?[^"']*)?(?=["'])'''
+    )
+
+
+def _plain_name(name):
+    """script.0123456789.js -> script.js"""
+    return re.sub(rf'\.[0-9a-f]{{{HASH_LENGTH}}}(\.[a-z]+)$', r'\1', name)
+
+
+def is_fingerprinted_copy(name):
+    """Check whether a site-relative path is a fingerprinted copy of an asset."""
+    return name != _plain_name(name) and _plain_name(name) in ASSETS
+
+
+def iter_html_files(root):
+    """Yield the paths of all HTML files of the site."""
+    for current, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in PAGE_SKIP_DIRS)
+        for name in sorted(files):
+            if name.endswith('.html'):
+                yield os.path.join(current, name)
+
+
+def write_fingerprinted_assets(root, assets=ASSETS):
+    """
+    Write the fingerprinted copies and remove outdated ones.
+
+    Returns:
+        Dictionary asset -> {'path', 'sha256', 'size'}
+    """
+    entries = {}
+
+    for asset in assets:
+        source = os.path.join(root, asset)
+        if not os.path.exists(source):
+            print(f"  Asset not found, skipping: {asset}")
+            continue
+
+        with open(source, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        name = fingerprinted_name(asset, digest)
+
+        target = os.path.join(root, name)
+        if not os.path.exists(target):
+            tmp_path = f"{target}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, target)
+            print(f"  {asset} -> {name}")
+
+        stem, ext = os.path.splitext(asset)
+        for old in glob.glob(os.path.join(root, f"{stem}.*{ext}")):
+            old_name = os.path.basename(old)
+            if old_name != name and _plain_name(old_name) == asset:
+                os.remove(old)
+                print(f"  Removed outdated {old_name}")
+
+        entries[asset] = {'path': name, 'sha256': digest, 'size': len(content)}
+
+    return entries
+
+
+def rewrite_references(root, entries, paths=None):
+    """
+    Point every asset reference in the site's HTML at the fingerprinted name.
+
+    Args:
+        root: Site directory
+        entries: Output of write_fingerprinted_assets()
+        paths: Only rewrite these HTML files (default: all of the site)
+
+    Returns:
+        Tuple of (HTML files scanned, HTML files changed)
+    """
+    if not entries:
+        return 0, 0
+
+    pattern = _reference_pattern(list(entries))
+
+    def replace(match):
+        target = entries[_plain_name(match.group('name'))]['path']
+        return f"{match.group('attr')}{match.group('prefix')}{target}"
+
+    scanned = changed = 0
+    for path in (iter_html_files(root) if paths is None else paths):
+        scanned += 1
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+
+        new_content = pattern.sub(replace, content)
+        if new_content != content:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(new_content)
+            changed += 1
+
+    return scanned, changed
+
+
+def write_manifest(root, entries):
+    """
+    Write asset-manifest.json for the server's cache headers.
+    """
+    manifest = {
+        'assets': entries,
+        'cache_control': {
+            'immutable': IMMUTABLE_CACHE_CONTROL,
+            'default': DEFAULT_CACHE_CONTROL
+        }
+    }
+    path = os.path.join(root, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_manifest(root=SCRIPT_DIR):
+    """
+    Load asset-manifest.json.
+
+    Returns:
+        The manifest dictionary, or None if assets were never fingerprinted
+    """
+    try:
+        with open(os.path.join(root, MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def fingerprint_site(root=SCRIPT_DIR):
+    """
+    Run the whole fingerprinting stage on a site tree.
+
+    Returns:
+        Dictionary with assets (manifest entries), scanned and changed
+    """
+    entries = write_fingerprinted_assets(root)
+    scanned, changed = rewrite_references(root, entries)
+    write_manifest(root, entries)
+    return {'assets': entries, 'scanned': scanned, 'changed': changed}
+
+
+def main():
+    """Fingerprint the assets of the site."""
+
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+
+    print("=" * 60)
+    print("Asset Fingerprinting")
+    print("=" * 60)
+
+    result = fingerprint_site(root)
+
+    print(f"  HTML files: {result['scanned']}, rewritten: {result['changed']}")
+    print(f"  Manifest: {MANIFEST_NAME}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
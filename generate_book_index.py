@@ -0,0 +1,455 @@
+"""
+Generate literatura/index.html and literatura/books.json from the catalog
+
+This script:
+1. Collects every book page in literatura/ (the pages generate_book_pages.py writes)
+2. Keeps the hand-written card data (icon, description, tag) from books.json
+3. Renders one card per book, reusing cached cards for books that did not change
+4. Writes books.json and the static listing page
+
+Once the catalog grows past PAGE_SPLIT_THRESHOLD books, the listing is split
+by genre (grouped by get_emoji_for_genre()) into pages of GENRE_PAGE_SIZE
+books, and index.html only links to the genres.
+"""
+
+import hashlib
+import html
+import json
+import os
+import re
+import unicodedata
+
+from generate_book_pages import create_slug, get_emoji_for_genre
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+LITERATURA_DIR = os.path.join(SCRIPT_DIR, "literatura")
+CARD_CACHE_PATH = os.path.join(SCRIPT_DIR, ".cache", "book_cards.json")
+
+# Bump whenever render_card() changes, so cached cards are redone
+CARD_VERSION = "1"
+
+# From this many books on, the listing is split by genre
+PAGE_SPLIT_THRESHOLD = 200
+
+# Books per genre page
+GENRE_PAGE_SIZE = 60
+
+# Seconds between the fade-ins of consecutive cards on a listing page
+CARD_DELAY_STEP = 0.05
+
+# Prefix of the generated genre pages, e.g. zanr-romany.html
+GENRE_PAGE_PREFIX = "zanr-"
+
+# Names of the genre groups, keyed by get_emoji_for_genre() result
+GENRE_LABELS = {
+    '📖': 'Romány',
+    '📕': 'Novely',
+    '🌟': 'Pohádky',
+    '🎭': 'Dramata',
+    '😄': 'Komedie',
+    '😢': 'Tragédie',
+    '🚀': 'Sci-fi',
+    '🧙': 'Fantasy',
+    '🔍': 'Detektivky',
+    '⚔️': 'Válečná literatura',
+    '📜': 'Historická literatura',
+    '🤔': 'Filosofická literatura',
+    '✨': 'Poezie',
+    '📚': 'Povídky',
+}
+
+CZECH_ALPHABET = ['a', 'b', 'c', 'č', 'd', 'e', 'f', 'g', 'h', 'ch', 'i', 'j', 'k', 'l', 'm',
+                  'n', 'o', 'p', 'q', 'r', 'ř', 's', 'š', 't', 'u', 'v', 'w', 'x', 'y', 'z', 'ž']
+CZECH_RANK = {letter: rank for rank, letter in enumerate(CZECH_ALPHABET)}
+
+CARD_FIELDS = ['filename', 'title', 'author', 'icon', 'description', 'tag']
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="cs">
+
+<head>
+    <!-- Google AdSense -->
+    <script async src="https://pagead2.googlesyndication.com/pagead/js/adsbygoogle.js?client=ca-pub-5043142893920978"
+        crossorigin="anonymous"></script>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <meta name="description"
+        content="{description}">
+    <title>{title} - Maturita Portál</title>
+    <link rel="preconnect" href="https://fonts.googleapis.com">
+    <link rel="preconnect" href="https://fonts.gstatic.com" crossorigin>
+    <link href="https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=Outfit:wght@700;800&display=swap"
+        rel="stylesheet">
+    <link rel="stylesheet" href="../styles.css">
+</head>
+
+<body>
+    <div class="container">
+        <header>
+            <a href="../index.html" class="logo">MaturitaPortál</a>
+            <nav>
+                <ul>
+                    <li><a href="../index.html">Domů</a></li>
+                    <li><a href="index.html" class="active">Literatura</a></li>
+                    <li><a href="../ict/index.html">ICT</a></li>
+                    <li><a href="../chemie/index.html">Chemie</a></li>
+                </ul>
+            </nav>
+        </header>
+
+        <main>
+            <a href="{back_href}" class="back-link">{back_text}</a>
+
+            <section class="section-header animate-fade-in">
+                <h1><span class="text-gradient-literatura">{heading}</span></h1>
+                <p class="subtitle">
+                    {subtitle}
+                </p>
+            </section>
+
+            <div class="cards-grid" id="books-grid">
+{cards}
+            </div>
+{pagination}
+        </main>
+
+        <footer>
+            <p>© 2025 MaturitaPortál | Vytvořeno pro přípravu na maturitu</p>
+            <p style="margin-top: 0.5rem; font-size: 0.85rem;">
+                <a href="../privacy.html" style="color: var(--text-muted);">Zásady ochrany osobních údajů</a> |
+                <a href="mailto:prasecibota@gmail.com" style="color: var(--text-muted);">Kontakt</a>
+            </p>
+        </footer>
+    </div>
+
+    <script src="../script.js"></script>
+</body>
+
+</html>"""
+
+INDEX_DESCRIPTION = ("Seznam literárních děl pro maturitní zkoušku z českého jazyka. "
+                     "Rozbory, charakteristiky postav a literární kontext.")
+INDEX_SUBTITLE = "Kompletní rozbory literárních děl pro ústní maturitní zkoušku z českého jazyka"
+
+
+def czech_sort_key(text):
+    """
+    Sort key following Czech alphabetical order (ch after h, č after c, ...).
+    """
+    text = text.lower()
+    key = []
+    i = 0
+
+    while i < len(text):
+        if text.startswith('ch', i):
+            key.append((3, CZECH_RANK['ch']))
+            i += 2
+            continue
+
+        char = text[i]
+        i += 1
+        if char not in CZECH_RANK:
+            # Letters like á or ď sort with their base letter
+            char = unicodedata.normalize('NFKD', char)[0]
+
+        if char in CZECH_RANK:
+            key.append((3, CZECH_RANK[char]))
+        elif char.isdigit():
+            key.append((2, int(char)))
+        elif char.isspace():
+            key.append((0, 0))
+        else:
+            key.append((1, ord(char)))
+
+    return key, text
+
+
+def read_book_page(path):
+    """
+    Read card data from a book page written by generate_html_page().
+
+    Returns:
+        Dictionary with the CARD_FIELDS, or None if the page has no book header
+    """
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        content = f.read()
+
+    title = re.search(r'<h1>(.*?)</h1>', content, re.DOTALL)
+    if not title or 'book-header' not in content:
+        return None
+
+    author = re.search(r'<p class="author">(.*?)</p>', content, re.DOTALL)
+    genre = re.search(r'<span class="meta-item">(.*?)</span>', content, re.DOTALL)
+    description = re.search(r'<meta name="description"\s+content="(.*?)"', content, re.DOTALL)
+
+    # The first meta item is "<emoji> <genre>"
+    tag = html.unescape(genre.group(1)).split(' ', 1)[-1].strip() if genre else "Nezjištěno"
+
+    return {
+        'filename': os.path.basename(path),
+        'title': html.unescape(title.group(1)).strip(),
+        'author': html.unescape(author.group(1)).strip() if author else "Neznámý autor",
+        'icon': get_emoji_for_genre(tag),
+        'description': html.unescape(description.group(1)).strip() if description else "",
+        'tag': tag
+    }
+
+
+def load_curated_entries(html_dir=LITERATURA_DIR):
+    """
+    Load hand-written card data, keyed by filename.
+
+    Uses books.json, and the book array of a hand-written index.html that
+    has not been generated by this script yet.
+    """
+    curated = {}
+
+    index_path = os.path.join(html_dir, "index.html")
+    if os.path.exists(index_path):
+        with open(index_path, 'r', encoding='utf-8-sig') as f:
+            match = re.search(r'const\s+books\s*=\s*(\[[\s\S]*?\]);', f.read())
+        if match:
+            for book in json.loads(match.group(1)):
+                curated[book['filename']] = book
+
+    books_json_path = os.path.join(html_dir, "books.json")
+    if os.path.exists(books_json_path):
+        with open(books_json_path, 'r', encoding='utf-8') as f:
+            for book in json.load(f):
+                curated[book['filename']] = book
+
+    return curated
+
+
+def build_catalog(html_dir=LITERATURA_DIR):
+    """
+    Build the list of book cards, sorted by title.
+
+    Every book page in html_dir gets a card; hand-written card data wins
+    over what can be read from the page itself.
+    """
+    curated = load_curated_entries(html_dir)
+    catalog = []
+
+    for filename in os.listdir(html_dir):
+        if not filename.endswith('.html') or filename == 'index.html' or filename.startswith(GENRE_PAGE_PREFIX):
+            continue
+
+        entry = read_book_page(os.path.join(html_dir, filename))
+        if entry is None and filename not in curated:
+            continue
+
+        entry = entry or {'filename': filename}
+        entry.update({key: value for key, value in curated.get(filename, {}).items() if value})
+        catalog.append({field: entry.get(field, "") for field in CARD_FIELDS})
+
+    catalog.sort(key=lambda book: czech_sort_key(book['title']))
+    return catalog
+
+
+def render_card(book, href_prefix=""):
+    """
+    Render the listing card of one book.
+    """
+    e = {key: html.escape(value) for key, value in book.items()}
+    return f"""                <a href="{href_prefix}{e['filename']}" class="card literatura animate-fade-in">
+                    <div class="card-icon">{e['icon']}</div>
+                    <h3>{e['title']}</h3>
+                    <p class="author">{e['author']}</p>
+                    <p class="description">{e['description']}</p>
+                    <span class="tag">{e['tag']}</span>
+                </a>"""
+
+
+def load_card_cache(cache_path=CARD_CACHE_PATH):
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_card_cache(cache, cache_path=CARD_CACHE_PATH):
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+
+
+def render_cards(catalog, cache):
+    """
+    Render the cards of all books, reusing cached cards of unchanged books.
+
+    Args:
+        catalog: Book entries from build_catalog()
+        cache: Dictionary filename -> {'hash', 'html'}, updated in place
+
+    Returns:
+        Tuple of (dictionary filename -> card HTML, number of re-rendered cards)
+    """
+    cards = {}
+    rendered = 0
+
+    for book in catalog:
+        digest = hashlib.sha256(
+            (CARD_VERSION + json.dumps(book, sort_keys=True, ensure_ascii=False)).encode('utf-8')
+        ).hexdigest()
+
+        cached = cache.get(book['filename'])
+        if cached and cached['hash'] == digest:
+            cards[book['filename']] = cached['html']
+            continue
+
+        card = render_card(book)
+        cache[book['filename']] = {'hash': digest, 'html': card}
+        cards[book['filename']] = card
+        rendered += 1
+
+    # Forget books that are gone
+    for filename in set(cache) - set(cards):
+        del cache[filename]
+
+    return cards, rendered
+
+
+def stagger_cards(cards):
+    """
+    Join the cards of a listing page, each fading in CARD_DELAY_STEP after
+    the one before it.
+
+    The delay depends on the position on the page, so it is added here and
+    not to the cached cards.
+    """
+    return "\n".join(
+        card.replace(' class="card ', f' style="animation-delay: {index * CARD_DELAY_STEP:.2f}s;" class="card ', 1)
+        for index, card in enumerate(cards)
+    )
+
+
+def render_page(title, heading, subtitle, cards_html, description=INDEX_DESCRIPTION,
+                back_href="../index.html", back_text="← Zpět na hlavní stránku", pagination=""):
+    """
+    Render a complete listing page.
+    """
+    return PAGE_TEMPLATE.format(
+        title=html.escape(title),
+        heading=html.escape(heading),
+        subtitle=html.escape(subtitle),
+        description=html.escape(description),
+        back_href=back_href,
+        back_text=back_text,
+        cards=cards_html,
+        pagination=pagination
+    )
+
+
+def render_pagination(page_files, current):
+    """
+    Render links to all pages of a paginated genre listing.
+    """
+    links = []
+    for number, page_file in enumerate(page_files, 1):
+        if number == current:
+            links.append(f'<strong style="padding: 0.5rem 0.75rem;">{number}</strong>')
+        else:
+            links.append(f'<a href="{page_file}" class="back-link" style="margin: 0;">{number}</a>')
+
+    return ('            <nav style="display: flex; gap: 0.5rem; justify-content: center; margin-top: 2rem;">\n'
+            + "\n".join(f"                {link}" for link in links)
+            + "\n            </nav>")
+
+
+def render_genre_card(emoji, label, count, page_file):
+    """
+    Render the card linking to one genre on the split index page.
+    """
+    word = 'kniha' if count == 1 else 'knihy' if 2 <= count <= 4 else 'knih'
+    return f"""                <a href="{page_file}" class="card literatura animate-fade-in">
+                    <div class="card-icon">{emoji}</div>
+                    <h3>{html.escape(label)}</h3>
+                    <span class="tag">{count} {word}</span>
+                </a>"""
+
+
+def write_file(path, content):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+
+
+def build_book_index(html_dir=LITERATURA_DIR, cache_path=CARD_CACHE_PATH):
+    """
+    Write books.json and the listing page(s) for all books in html_dir.
+
+    Returns:
+        Dictionary with books, rendered (re-rendered cards) and pages (written files)
+    """
+    catalog = build_catalog(html_dir)
+    cache = load_card_cache(cache_path)
+    cards, rendered = render_cards(catalog, cache)
+
+    write_file(os.path.join(html_dir, "books.json"),
+               json.dumps(catalog, ensure_ascii=False, indent=2) + "\n")
+
+    pages = {}
+
+    if len(catalog) < PAGE_SPLIT_THRESHOLD:
+        pages["index.html"] = render_page(
+            "Literatura", "Literatura", INDEX_SUBTITLE,
+            stagger_cards(cards[book['filename']] for book in catalog)
+        )
+    else:
+        # Group by genre emoji, keeping the alphabetical order inside groups
+        groups = {}
+        for book in catalog:
+            groups.setdefault(get_emoji_for_genre(book['tag']), []).append(book)
+
+        genre_cards = []
+        for emoji, books in sorted(groups.items(), key=lambda item: czech_sort_key(GENRE_LABELS.get(item[0], 'Ostatní'))):
+            label = GENRE_LABELS.get(emoji, 'Ostatní')
+            slug = create_slug(label)
+            chunks = [books[i:i + GENRE_PAGE_SIZE] for i in range(0, len(books), GENRE_PAGE_SIZE)]
+            page_files = [f"{GENRE_PAGE_PREFIX}{slug}.html" if number == 1 else f"{GENRE_PAGE_PREFIX}{slug}-{number}.html"
+                          for number in range(1, len(chunks) + 1)]
+
+            for number, (chunk, page_file) in enumerate(zip(chunks, page_files), 1):
+                pages[page_file] = render_page(
+                    f"{label} - Literatura", label, f"{len(books)} děl v žánru {label.lower()}",
+                    stagger_cards(cards[book['filename']] for book in chunk),
+                    back_href="index.html", back_text="← Zpět na seznam žánrů",
+                    pagination=render_pagination(page_files, number) if len(page_files) > 1 else ""
+                )
+
+            genre_cards.append(render_genre_card(emoji, label, len(books), page_files[0]))
+
+        pages["index.html"] = render_page("Literatura", "Literatura", INDEX_SUBTITLE, stagger_cards(genre_cards))
+
+    for page_file, content in pages.items():
+        write_file(os.path.join(html_dir, page_file), content)
+
+    # Remove genre pages left over from a previous, larger split
+    for filename in os.listdir(html_dir):
+        if filename.startswith(GENRE_PAGE_PREFIX) and filename.endswith('.html') and filename not in pages:
+            os.remove(os.path.join(html_dir, filename))
+
+    save_card_cache(cache, cache_path)
+
+    return {'books': len(catalog), 'rendered': rendered, 'pages': sorted(pages)}
+
+
+def main():
+    """Regenerate the literatura listing."""
+
+    print("=" * 70)
+    print("Book Index Generator for Maturita Portal")
+    print("=" * 70)
+
+    stats = build_book_index()
+
+    print(f"Books: {stats['books']}")
+    print(f"Cards re-rendered: {stats['rendered']} (others reused from cache)")
+    print(f"Pages written: {', '.join(stats['pages'])}")
+    print("Catalog written: literatura/books.json")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
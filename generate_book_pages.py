@@ -5,32 +5,40 @@ This script:
 1. Parses books_info.txt to extract book information and PDF URLs
 2. Fixes the URL typo (.czfiles -> .cz/files)
 3. Downloads PDFs and extracts text content
-4. Generates nicely formatted HTML pages for each book
-5. Updates the literatura/index.html with all book links
+4. Generates nicely formatted HTML pages for each book, with similar works
+   found by related_books.py; existing pages get their similar works
+   refreshed
+5. Regenerates literatura/index.html and books.json (see generate_book_index.py)
 
 Requirements:
-    pip install requests pypdf2
+    pip install requests pypdf2 numpy scipy
 """
 
+import html
+import json
 import os
 import re
 import sys
 from urllib.parse import unquote
 
-# Check for required packages
-try:
-    import requests
-except ImportError:
-    print("Installing requests...")
-    os.system("pip install requests")
-    import requests
+from book_reader import write_book_chunks
+from build_site import build_site
+from extraction_cache import cached_extract_text
+from extraction_workers import supervised_extract_text
+from generate_sitemap import write_sitemap
+from generate_topic_pages import build_topic_pages
+import http_cassette
+from near_duplicates import add_unless_duplicate, build_index
+from related_books import compute_related, load_texts
+from site_stats import write_site_stats
 
-try:
-    from PyPDF2 import PdfReader
-except ImportError:
-    print("Installing PyPDF2...")
-    os.system("pip install pypdf2")
-    from PyPDF2 import PdfReader
+# Marks the "similar works" section, see update_related_books()
+RELATED_START = "<!-- related-books -->"
+RELATED_END = "<!-- /related-books -->"
+RELATED_SECTION_RE = re.compile(r'\n[ \t]*' + re.escape(RELATED_START) + r'.*?' + re.escape(RELATED_END), re.S)
+
+# End of the content panel of a book page
+CONTENT_END_RE = re.compile(r'\n[ \t]*</div>\s*</main>')
 
 
 def parse_books_info(file_path):
@@ -136,7 +144,7 @@ def download_pdf(url, output_path):
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
-        response = requests.get(url, headers=headers, timeout=30)
+        response = http_cassette.get(url, headers=headers, timeout=30)
         response.raise_for_status()
         
         with open(output_path, 'wb') as f:
@@ -158,20 +166,9 @@ def extract_text_from_pdf(pdf_path):
         Extracted text content
     """
     try:
-        reader = PdfReader(pdf_path)
-        text_parts = []
-        
-        for page in reader.pages:
-            page_text = page.extract_text()
-            if page_text:
-                text_parts.append(page_text)
-        
-        full_text = "\n\n".join(text_parts)
-        
-        # Clean up the text
-        full_text = re.sub(r'\n{3,}', '\n\n', full_text)
-        full_text = re.sub(r' {2,}', ' ', full_text)
-        
+        # Identical PDFs are only parsed once, whatever their slug; parsing
+        # runs in a supervised worker with time and memory limits
+        full_text, _ = cached_extract_text(pdf_path, extract=supervised_extract_text)
         return full_text
         
     except Exception as e:
@@ -192,17 +189,181 @@ def save_text(text, output_path):
         return False
 
 
-def generate_html_page(book, text_content, output_path):
+def iter_text_file(text_path, chunk_size=8192):
     """
-    Generate an HTML page for a book with extracted text.
+    Yield the contents of a text file in fixed-size chunks.
+    
+    Consumers can stop iterating early, so only the part of the file
+    they actually need is read from disk.
     """
-    # Get first few paragraphs as excerpt (for preview)
-    paragraphs = [p.strip() for p in text_content.split('\n\n') if p.strip()]
-    excerpt = '\n\n'.join(paragraphs[:3]) if paragraphs else "Text není k dispozici."
+    with open(text_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def extract_excerpt(chunks, max_paragraphs=3, max_chars=1500):
+    """
+    Build a short excerpt from the start of a text.
+    
+    Args:
+        chunks: The text as a string or an iterable of text chunks
+                (see iter_text_file())
+        max_paragraphs: Maximum number of paragraphs to include
+        max_chars: Excerpt length after which the text is cut off with "..."
+    
+    Returns:
+        The excerpt, or a placeholder if the text is empty
+    """
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    
+    paragraphs = []
+    buffer = ""
+    
+    for chunk in chunks:
+        buffer += chunk
+        
+        # Everything before the last separator is a complete paragraph
+        parts = buffer.split('\n\n')
+        buffer = parts.pop()
+        paragraphs.extend(p.strip() for p in parts if p.strip())
+        
+        if len(paragraphs) >= max_paragraphs:
+            break
+        
+        # Stop once the excerpt is going to be truncated anyway
+        pending = paragraphs + ([buffer.strip()] if buffer.strip() else [])
+        if len('\n\n'.join(pending)) > max_chars:
+            break
+    
+    if buffer.strip():
+        paragraphs.append(buffer.strip())
+    
+    excerpt = '\n\n'.join(paragraphs[:max_paragraphs])
+    if not excerpt:
+        return "Text není k dispozici."
     
     # Truncate if too long
-    if len(excerpt) > 1500:
-        excerpt = excerpt[:1500] + "..."
+    if len(excerpt) > max_chars:
+        excerpt = excerpt[:max_chars] + "..."
+    
+    return excerpt
+
+
+def find_related_books(text_dir, html_dir, books, pending=(), texts=None):
+    """
+    Find similar works for every text in text_dir.
+    
+    Only books whose page exists, or is about to be written (slugs in
+    pending), are recommended, so the lists never contain dead links.
+    texts are the texts already loaded with load_texts(), if the caller
+    has them; otherwise text_dir is read.
+    
+    Returns:
+        Dictionary of slug -> list of dicts with filename, title and author
+    """
+    known = {}
+    
+    books_json_path = os.path.join(html_dir, "books.json")
+    if os.path.exists(books_json_path):
+        with open(books_json_path, 'r', encoding='utf-8') as f:
+            for entry in json.load(f):
+                known[entry['filename'][:-len('.html')]] = entry
+    
+    for book in books:
+        known.setdefault(book['slug'], {
+            'filename': f"{book['slug']}.html",
+            'title': book['title'],
+            'author': book['author']
+        })
+    
+    pending = set(pending)
+    known = {slug: entry for slug, entry in known.items()
+             if slug in pending or os.path.exists(os.path.join(html_dir, entry['filename']))}
+    
+    if texts is None:
+        texts = load_texts(text_dir)
+    related = compute_related(texts, linkable=set(known))
+    
+    return {
+        slug: [known[other] for other, _ in neighbours]
+        for slug, neighbours in related.items()
+    }
+
+
+def render_related_books(related):
+    """
+    Render the "similar works" section of a book page.
+    
+    The section is wrapped in RELATED_START/RELATED_END, so
+    update_related_books() can replace it in place later.
+    """
+    if not related:
+        return ""
+    
+    items = "\n".join(
+        f'                    <li><a href="{html.escape(other["filename"])}">{html.escape(other["title"])}</a>'
+        f' – {html.escape(other["author"])}</li>'
+        for other in related
+    )
+    
+    return f"""                {RELATED_START}
+                <h2 style="margin-top: 2rem;">Podobná díla</h2>
+                <ul>
+{items}
+                </ul>
+                {RELATED_END}"""
+
+
+def update_related_books(html_path, related):
+    """
+    Insert or refresh the "similar works" section of an existing page.
+    
+    Pages written before the section existed, hand-written ones included,
+    get it at the end of their content panel.
+    
+    Returns:
+        True if the page was changed
+    """
+    with open(html_path, 'r', encoding='utf-8') as f:
+        page = f.read()
+    
+    section = render_related_books(related)
+    replacement = f"\n{section}" if section else ""
+    
+    if RELATED_SECTION_RE.search(page):
+        updated = RELATED_SECTION_RE.sub(lambda match: replacement, page, count=1)
+    else:
+        match = CONTENT_END_RE.search(page)
+        if match is None or not section:
+            return False
+        updated = page[:match.start()] + replacement + page[match.start():]
+    
+    if updated == page:
+        return False
+    
+    tmp_path = f"{html_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(updated)
+    os.replace(tmp_path, html_path)
+    return True
+
+
+def generate_html_page(book, text_content, output_path, related=None):
+    """
+    Generate an HTML page for a book with extracted text.
+    
+    text_content can be the full text or an iterable of chunks; only the
+    start of it is consumed for the excerpt. The full text is loaded by the
+    reader from the chunks book_reader.py writes. related is the list of
+    similar works from find_related_books().
+    """
+    # Get first few paragraphs as excerpt (for preview)
+    excerpt = extract_excerpt(text_content)
+    related_html = render_related_books(related)
     
     # Escape HTML
     excerpt = excerpt.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
@@ -257,10 +418,11 @@ def generate_html_page(book, text_content, output_path):
                     </p>
                 </div>
 
-                <div style="padding: 1rem; background: rgba(67, 233, 123, 0.1); border-radius: 8px;">
-                    <p style="margin: 0;">
-                        <strong>📄 Plný text:</strong> Text byl extrahován z PDF a je k dispozici pro studijní účely.
-                        Pro studium doporučujeme přečíst si celé dílo.
+                <div class="book-reader" data-chunks="chunks/{book['slug']}/index.json">
+                    <h2 style="margin-top: 2rem;">Plný text</h2>
+                    <div class="book-reader-text"></div>
+                    <p class="book-reader-status" style="padding: 1rem; background: rgba(67, 233, 123, 0.1); border-radius: 8px;">
+                        <a href="chunks/{book['slug']}/000.html">📄 Číst celý text</a>
                     </p>
                 </div>
 
@@ -270,6 +432,7 @@ def generate_html_page(book, text_content, output_path):
                     <strong>Autor:</strong> {book['author']}<br>
                     <strong>Žánr:</strong> {book['genre']}
                 </p>
+{related_html}
 
                 <div style="margin-top: 2rem; padding: 1rem; background: rgba(250, 112, 154, 0.05); border-left: 4px solid rgba(250, 112, 154, 0.5); border-radius: 4px;">
                     <p style="margin: 0; font-size: 0.9rem; color: rgba(255, 255, 255, 0.7);">
@@ -282,6 +445,10 @@ def generate_html_page(book, text_content, output_path):
 
         <footer>
             <p>© 2025 MaturitaPortál | Vytvořeno pro přípravu na maturitu</p>
+            <p style="margin-top: 0.5rem; font-size: 0.85rem;">
+                <a href="../privacy.html" style="color: var(--text-muted);">Zásady ochrany osobních údajů</a> |
+                <a href="mailto:prasecibota@gmail.com" style="color: var(--text-muted);">Kontakt</a>
+            </p>
         </footer>
     </div>
 
@@ -376,6 +543,16 @@ def main():
     print(f"\nProcessing {len(books_to_process)} books...\n")
     
     results = []
+    pending = []
+    
+    # Every text is read once; the duplicate check and the related books
+    # both work from these, new texts are added as they are extracted
+    texts = load_texts(text_dir)
+    
+    # Texts that already have a page; new texts matching one are not rendered again
+    published = {slug: text for slug, text in texts.items()
+                 if os.path.exists(os.path.join(html_dir, f"{slug}.html"))}
+    duplicate_index = build_index(published)
     
     for i, book in enumerate(books_to_process, 1):
         print(f"[{i}/{len(books_to_process)}] {book['title']}")
@@ -404,16 +581,17 @@ def main():
         
         # Extract text
         text_content = ""
-        if os.path.exists(text_path):
-            print(f"  Text file already exists, loading...")
-            with open(text_path, 'r', encoding='utf-8') as f:
-                text_content = f.read()
+        if book['slug'] in texts:
+            # Already loaded with the other texts above
+            print(f"  Text file already exists")
+            text_content = texts[book['slug']]
         else:
             print(f"  Extracting text from PDF...")
             text_content = extract_text_from_pdf(pdf_path)
             
             if text_content:
                 save_text(text_content, text_path)
+                texts[book['slug']] = text_content
                 word_count = len(text_content.split())
                 print(f"  Saved text: {word_count} words")
             else:
@@ -421,15 +599,42 @@ def main():
                 print()
                 continue
         
-        # Generate HTML
-        print(f"  Generating HTML page...")
-        if generate_html_page(book, text_content, html_path):
+        # The same work under another slug or a re-upload of an analysis
+        duplicate = add_unless_duplicate(duplicate_index, book['slug'], texts[book['slug']])
+        if duplicate:
+            print(f"  Same content as {duplicate[0]}.html ({duplicate[1]:.0%}), skipping...")
+            results.append((book['title'], f"SKIPPED - Duplicate of {duplicate[0]}"))
+            print()
+            continue
+        
+        # HTML is generated once all texts are known, see below
+        pending.append((book, text_content, html_path))
+        print()
+    
+    # Related books are computed over the whole corpus in one batch
+    print("Finding related books...")
+    pending_slugs = {book['slug'] for book, _, _ in pending}
+    related = find_related_books(text_dir, html_dir, books, pending_slugs, texts)
+    print()
+    
+    for book, text_content, html_path in pending:
+        print(f"Generating HTML page: {book['title']}")
+        if generate_html_page(book, text_content, html_path, related.get(book['slug'])):
             results.append((book['title'], "SUCCESS"))
             print(f"  Created: {book['slug']}.html")
         else:
             results.append((book['title'], "FAILED - HTML generation error"))
-        
-        print()
+    
+    # Existing pages follow the catalog: new books show up in their lists
+    updated = 0
+    for slug, others in sorted(related.items()):
+        existing_path = os.path.join(html_dir, f"{slug}.html")
+        if slug not in pending_slugs and os.path.exists(existing_path):
+            updated += update_related_books(existing_path, others)
+    if updated:
+        print(f"Updated similar works on {updated} existing pages")
+    
+    print()
     
     # Summary
     print("=" * 70)
@@ -457,7 +662,34 @@ def main():
     print(f"  Text: {text_dir}")
     print(f"  HTML: {html_dir}")
     print("=" * 70)
-    print("\nNext step: Update literatura/index.html with links to all books!")
+    
+    # Imported here because generate_book_index imports this module
+    from generate_book_index import build_book_index
+    
+    print("\nUpdating literatura/index.html and books.json...")
+    stats = build_book_index(html_dir)
+    print(f"  {stats['books']} books listed, {stats['rendered']} cards re-rendered")
+    
+    print("\nWriting full-text reader chunks...")
+    stats = write_book_chunks(text_dir, html_dir)
+    print(f"  {stats['written']} of {stats['books']} books re-chunked")
+    
+    print("\nRendering changed topic pages...")
+    written = build_topic_pages(script_dir)
+    print(f"  {len(written)} topic pages rendered")
+    
+    print("\nWriting site-stats.json...")
+    stats = write_site_stats(script_dir)
+    print(f"  {stats['books']} books, {len(stats['sections'])} sections")
+    
+    print("\nWriting sitemap.xml...")
+    stats = write_sitemap(script_dir)
+    print(f"  {stats['pages']} pages, {stats['changed']} with a new lastmod")
+    
+    # Fingerprinting and the service worker only touch the staged copy
+    print("\nBuilding dist in a staging directory...")
+    stats = build_site(script_dir)
+    print(f"  {stats['files']} files, now live in dist (version {stats['version']})")
 
 
 if __name__ == "__main__":
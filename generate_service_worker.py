@@ -0,0 +1,397 @@
+"""
+Service Worker Generator for Maturita Portal
+
+Makes the portal usable offline on unreliable school Wi-Fi:
+
+1. Hashes every page and asset of the site and groups them by section
+   (core, literatura, chemie, ict, ict/hw, ict/psi, ...) in
+   precache-manifest.json
+2. Writes sw.js, which precaches the core pages on install and a whole
+   section as soon as one of its pages is visited. Pages and JSON data
+   are then answered network first, so a deploy shows up right away, with
+   the cached copy as the fallback offline or on a slow network; the other
+   files (fingerprinted assets, images) are answered from the cache.
+   Reader chunks are cached as they are read, so a book that was opened
+   once can be read offline
+3. When the manifest changes, the worker only refetches the entries whose
+   hash differs and drops the ones that were removed
+
+script.js registers the worker. Run this after fingerprint_assets.py, so
+the manifest lists the fingerprinted asset names the pages use.
+
+Usage:
+    python generate_service_worker.py [site_root]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from book_reader import CHUNKS_DIR
+from fingerprint_assets import MANIFEST_NAME as ASSET_MANIFEST_NAME, PAGE_SKIP_DIRS, load_manifest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Site-relative directory of the reader chunks, cached at runtime instead
+CHUNKS_PREFIX = os.path.relpath(CHUNKS_DIR, SCRIPT_DIR).replace(os.sep, '/') + '/'
+
+PRECACHE_MANIFEST_NAME = "precache-manifest.json"
+SERVICE_WORKER_NAME = "sw.js"
+
+# Section of the root pages and shared assets, always precached
+CORE_SECTION = "core"
+
+# File types worth having offline
+PRECACHE_EXTENSIONS = {'.html', '.css', '.js', '.json', '.png', '.jpg', '.jpeg', '.svg', '.webp', '.ico'}
+
+# Build outputs the worker fetches itself
+SKIP_FILES = {ASSET_MANIFEST_NAME, PRECACHE_MANIFEST_NAME, SERVICE_WORKER_NAME}
+
+# Hex digits of the content hash kept per entry
+HASH_LENGTH = 16
+
+SERVICE_WORKER_TEMPLATE = """// Generated by generate_service_worker.py - do not edit
+// Manifest version: __MANIFEST_VERSION__
+
+const CACHE_NAME = 'maturita-precache';
+// Reader chunks (see book_reader.py) are too many to precache; they are
+// cached in a cache of their own as they are read
+const READER_CACHE_NAME = 'maturita-reader';
+const CHUNKS_PREFIX = '__CHUNKS_PREFIX__';
+const MANIFEST_PATH = '__PRECACHE_MANIFEST__';
+const STATE_PATH = '__precache-state';
+const CORE_SECTION = '__CORE_SECTION__';
+
+// Check the manifest for changes at most once a minute
+const UPDATE_INTERVAL = 60 * 1000;
+
+// Pages and data wait this long for the network before the cached copy answers
+const NETWORK_TIMEOUT = 3000;
+
+const toUrl = path => new URL(path, self.registration.scope).href;
+
+let syncQueue = Promise.resolve();
+let lastSync = 0;
+let manifest = null;
+let cachedSections = [];
+
+const loadManifest = async () => {
+    const response = await fetch(toUrl(MANIFEST_PATH), { cache: 'no-cache' });
+    if (!response.ok) throw new Error(`manifest ${response.status}`);
+    manifest = await response.json();
+    return manifest;
+};
+
+const loadState = async cache => {
+    const response = await cache.match(toUrl(STATE_PATH));
+    return response ? response.json() : { sections: [], entries: {} };
+};
+
+const saveState = (cache, state) => cache.put(toUrl(STATE_PATH), new Response(JSON.stringify(state), {
+    headers: { 'Content-Type': 'application/json' }
+}));
+
+// Bring the cached sections up to date, fetching only entries whose hash changed
+const syncSections = async sections => {
+    const current = await loadManifest();
+    const cache = await caches.open(CACHE_NAME);
+    const state = await loadState(cache);
+
+    const wanted = [...new Set([CORE_SECTION, ...state.sections, ...sections])]
+        .filter(name => current.sections[name]);
+    const entries = Object.assign({}, ...wanted.map(name => current.sections[name]));
+
+    const changed = Object.keys(entries).filter(path => state.entries[path] !== entries[path]);
+    await Promise.all(changed.map(async path => {
+        try {
+            const response = await fetch(toUrl(path), { cache: 'reload' });
+            if (!response.ok) throw new Error(response.status);
+            await cache.put(toUrl(path), response);
+        } catch (error) {
+            // Keep the old copy (if any) and retry on the next sync
+            if (path in state.entries) entries[path] = state.entries[path];
+            else delete entries[path];
+        }
+    }));
+
+    const removed = Object.keys(state.entries).filter(path => !(path in entries));
+    await Promise.all(removed.map(path => cache.delete(toUrl(path))));
+
+    await saveState(cache, { version: current.version, sections: wanted, entries });
+    cachedSections = wanted;
+    lastSync = Date.now();
+};
+
+const queueSync = (sections = []) => {
+    syncQueue = syncQueue.then(() => syncSections(sections)).catch(error => {
+        console.log('precache sync failed:', error.message);
+    });
+    return syncQueue;
+};
+
+const sectionOf = url => {
+    if (!manifest) return null;
+    let path = url.slice(self.registration.scope.length).split(/[?#]/)[0];
+    if (path === '' || path.endsWith('/')) path += 'index.html';
+    return Object.keys(manifest.sections).find(name => path in manifest.sections[name]) || null;
+};
+
+// Answer from the network and refresh the cached copy; fall back to the
+// cache when offline or when the network takes longer than NETWORK_TIMEOUT
+const networkFirst = async (request, cache, key, store = false) => {
+    const cached = await cache.match(key);
+    const network = fetch(request).then(response => {
+        if ((cached || store) && response.ok && !response.redirected) {
+            cache.put(key, response.clone()).catch(() => {});
+        }
+        return response;
+    });
+    if (!cached) return network;
+
+    network.catch(() => {});
+    const timeout = new Promise(resolve => setTimeout(resolve, NETWORK_TIMEOUT, cached));
+    return Promise.race([network.catch(() => cached), timeout]);
+};
+
+// A chunk URL carries the version of its text (?v=...), so a cached chunk
+// stays valid; copies of other versions are dropped when a new one is cached
+const readerChunk = async (request, url) => {
+    const cache = await caches.open(READER_CACHE_NAME);
+    if (!url.search) return networkFirst(request, cache, url.href, true);
+
+    const cached = await cache.match(url.href);
+    if (cached) return cached;
+    const response = await fetch(request);
+    if (response.ok) {
+        const versions = await cache.keys(url.href, { ignoreSearch: true });
+        await Promise.all(versions.map(key => cache.delete(key)));
+        await cache.put(url.href, response.clone());
+    }
+    return response;
+};
+
+self.addEventListener('install', event => {
+    event.waitUntil(queueSync().then(() => self.skipWaiting()));
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil(self.clients.claim());
+});
+
+self.addEventListener('message', event => {
+    const message = event.data || {};
+    if (message.type === 'precache-section') {
+        event.waitUntil(queueSync([message.section]));
+    } else if (message.type === 'visit') {
+        // Precache the section of the visited page, check for updates now and then
+        const section = sectionOf(message.url);
+        const isNew = section && !cachedSections.includes(section);
+        if (isNew || !manifest || Date.now() - lastSync > UPDATE_INTERVAL) {
+            event.waitUntil(queueSync(section ? [section] : []).then(() => {
+                const visited = sectionOf(message.url);
+                if (visited && !cachedSections.includes(visited)) return queueSync([visited]);
+            }));
+        }
+    }
+});
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    if (request.method !== 'GET' || !request.url.startsWith(self.registration.scope)) return;
+
+    event.respondWith((async () => {
+        const url = new URL(request.url);
+        url.hash = '';
+        // index.json network first, the chunks themselves by version
+        if (url.href.slice(self.registration.scope.length).startsWith(CHUNKS_PREFIX)) {
+            return readerChunk(request, url);
+        }
+
+        url.search = '';
+        if (url.pathname.endsWith('/')) url.pathname += 'index.html';
+
+        const cache = await caches.open(CACHE_NAME);
+        // Pages and JSON (site-stats.json, books.json) change with every
+        // deploy: network first, so visitors never get an old copy while online
+        if (request.mode === 'navigate' || /\.(html|json)$/.test(url.pathname)) {
+            return networkFirst(request, cache, url.href);
+        }
+        // Fingerprinted assets never change under their name; the rest is
+        // refreshed by hash through syncSections()
+        const cached = await cache.match(url.href);
+        if (cached) return cached;
+        return fetch(request);
+    })());
+});
+"""
+
+
+def section_for_path(path):
+    """
+    Return the precache section of a site-relative path.
+
+        index.html, styles.css           -> core
+        ict/index.html                   -> ict
+        ict/hw.html, ict/hw/02-...html   -> ict/hw
+        chemie/01-vodik-ph.html          -> chemie
+    """
+    parts = path.split('/')
+    if len(parts) == 1:
+        return CORE_SECTION
+    if len(parts) == 2:
+        name = os.path.splitext(parts[1])[0]
+        if parts[0] == 'ict' and name != 'index':
+            return f"ict/{name}"
+        return parts[0]
+    if parts[0] == 'ict':
+        return f"ict/{parts[1]}"
+    return parts[0]
+
+
+def iter_site_files(root):
+    """
+    Yield the site-relative paths (with /) of all files worth precaching.
+    """
+    asset_manifest = load_manifest(root)
+    # Pages reference the fingerprinted copies, the originals are not needed
+    replaced = set(asset_manifest['assets']) if asset_manifest else set()
+
+    for current, dirs, files in os.walk(root):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and d not in PAGE_SKIP_DIRS)
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(current, name), root).replace(os.sep, '/')
+            if is_precached(path, replaced):
+                yield path
+
+
+def is_precached(path, replaced=()):
+    """
+    Check whether a site-relative path (with /) is one of the files
+    iter_site_files() yields; replaced are the assets that have
+    fingerprinted copies.
+    """
+    parts = path.split('/')
+    if any(part.startswith('.') or part in PAGE_SKIP_DIRS for part in parts[:-1]):
+        return False
+    if os.path.splitext(parts[-1])[1].lower() not in PRECACHE_EXTENSIONS:
+        return False
+    return path not in SKIP_FILES and path not in replaced
+
+
+def _manifest_version(sections):
+    return hashlib.sha256(json.dumps(sections, sort_keys=True).encode('utf-8')).hexdigest()[:HASH_LENGTH]
+
+
+def build_precache_manifest(root=SCRIPT_DIR):
+    """
+    Hash the site's files and group them by section.
+
+    Returns:
+        Dictionary with version (hash over all entries) and sections
+        (section -> {path: content hash})
+    """
+    sections = {}
+
+    for path in iter_site_files(root):
+        with open(os.path.join(root, path), 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:HASH_LENGTH]
+        sections.setdefault(section_for_path(path), {})[path] = digest
+
+    sections = {name: sections[name] for name in sorted(sections)}
+    return {'version': _manifest_version(sections), 'sections': sections}
+
+
+def _write_atomic(path, content):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_service_worker(root=SCRIPT_DIR):
+    """
+    Write precache-manifest.json and sw.js to the site root.
+
+    sw.js embeds the manifest version, so browsers see a new worker (and
+    sync the changed entries) whenever any precached file changes.
+
+    Returns:
+        The manifest dictionary
+    """
+    manifest = build_precache_manifest(root)
+    _write_worker(root, manifest)
+    return manifest
+
+
+def update_service_worker(root, hashes):
+    """
+    Update precache-manifest.json and sw.js for some changed files, without
+    hashing the rest of the site again (see build_site.update_build()).
+
+    Args:
+        root: Site directory with a precache manifest
+        hashes: Site-relative path -> SHA-256 hex digest of the new
+            content, or None for a removed file
+
+    Returns:
+        The manifest dictionary, or None if the site has no manifest yet
+    """
+    try:
+        with open(os.path.join(root, PRECACHE_MANIFEST_NAME), 'r', encoding='utf-8') as f:
+            sections = json.load(f)['sections']
+    except (OSError, ValueError, KeyError):
+        return None
+
+    asset_manifest = load_manifest(root)
+    replaced = set(asset_manifest['assets']) if asset_manifest else set()
+
+    for path, digest in hashes.items():
+        if not is_precached(path, replaced):
+            continue
+        section = section_for_path(path)
+        if digest is not None:
+            sections.setdefault(section, {})[path] = digest[:HASH_LENGTH]
+        elif sections.get(section, {}).pop(path, None) is not None and not sections[section]:
+            del sections[section]
+
+    sections = {name: sections[name] for name in sorted(sections)}
+    manifest = {'version': _manifest_version(sections), 'sections': sections}
+    _write_worker(root, manifest)
+    return manifest
+
+
+def _write_worker(root, manifest):
+    _write_atomic(os.path.join(root, PRECACHE_MANIFEST_NAME),
+                  json.dumps(manifest, ensure_ascii=False, indent=2))
+
+    worker = (SERVICE_WORKER_TEMPLATE
+              .replace('__MANIFEST_VERSION__', manifest['version'])
+              .replace('__PRECACHE_MANIFEST__', PRECACHE_MANIFEST_NAME)
+              .replace('__CORE_SECTION__', CORE_SECTION)
+              .replace('__CHUNKS_PREFIX__', CHUNKS_PREFIX))
+    _write_atomic(os.path.join(root, SERVICE_WORKER_NAME), worker)
+
+
+def main():
+    """Generate the service worker for the site."""
+
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+
+    print("=" * 60)
+    print("Service Worker Generator")
+    print("=" * 60)
+
+    manifest = write_service_worker(root)
+
+    for name, entries in manifest['sections'].items():
+        size = sum(os.path.getsize(os.path.join(root, path)) for path in entries)
+        print(f"  {name:<12} {len(entries):>4} files  {size / 1024:>8.0f} KB")
+    print()
+    print(f"  Manifest version: {manifest['version']}")
+    print(f"  Written: {PRECACHE_MANIFEST_NAME}, {SERVICE_WORKER_NAME}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Sitemap Generator for Maturita Portal
+
+Writes sitemap.xml with every page that can be reached from index.html,
+following the link graph of check_links.py.
+
+lastmod is the date the content of a page last changed. The content is
+the <main> element (the whole file for pages without one), so rewriting
+asset references or the shared layout does not mark every page as changed.
+The hashes are kept in .cache/sitemap.json; without them, dates already in
+sitemap.xml are kept.
+
+Usage:
+    python generate_sitemap.py [site_root]
+
+The site URL defaults to SITE_URL and can be set with the SITE_URL
+environment variable.
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+from urllib.parse import quote
+from xml.sax.saxutils import escape, unescape
+
+from check_links import check_site
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+SITEMAP_NAME = "sitemap.xml"
+SITE_URL = os.environ.get('SITE_URL', "https://maturitaportal.netlify.app/")
+
+MAIN_RE = re.compile(r'<main[^>]*>(.*)</main>', re.DOTALL)
+SITEMAP_ENTRY_RE = re.compile(r'<loc>([^<]*)</loc>\s*<lastmod>([^<]*)</lastmod>')
+
+
+def content_hash(path):
+    """Hash of the content of a page (its <main> element)."""
+    with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+        text = f.read()
+    match = MAIN_RE.search(text)
+    content = match.group(1) if match else text
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()[:16]
+
+
+def page_url(page, site_url=SITE_URL):
+    """Public URL of a site-relative page path; index.html maps to its directory."""
+    if page == 'index.html':
+        page = ''
+    elif page.endswith('/index.html'):
+        page = page[:-len('index.html')]
+    return site_url + quote(page)
+
+
+def read_lastmods(sitemap_path):
+    """Return {url: lastmod} of an existing sitemap."""
+    try:
+        with open(sitemap_path, 'r', encoding='utf-8') as f:
+            return {unescape(loc): lastmod for loc, lastmod in SITEMAP_ENTRY_RE.findall(f.read())}
+    except OSError:
+        return {}
+
+
+def render_sitemap(entries):
+    """
+    Render sitemap.xml.
+
+    Args:
+        entries: List of (url, lastmod)
+    """
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+    for url, lastmod in entries:
+        lines.append(f"  <url>\n    <loc>{escape(url)}</loc>\n    <lastmod>{lastmod}</lastmod>\n  </url>")
+    lines.append('</urlset>')
+    return '\n'.join(lines) + '\n'
+
+
+def write_sitemap(root=SCRIPT_DIR, site_url=SITE_URL):
+    """
+    Write sitemap.xml for the pages reachable from index.html.
+
+    Returns:
+        Dictionary with pages and changed (pages with a new lastmod)
+    """
+    cache_dir = os.path.join(root, ".cache")
+    state_path = os.path.join(cache_dir, "sitemap.json")
+    sitemap_path = os.path.join(root, SITEMAP_NAME)
+
+    report = check_site(root, os.path.join(cache_dir, "link_check.json"))
+    orphans = set(report['orphans'])
+    pages = sorted((page for page in report['graph'] if page not in orphans),
+                   key=lambda page: (page != 'index.html', page))
+
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = {}
+    previous = read_lastmods(sitemap_path)
+    today = datetime.date.today().isoformat()
+
+    entries = []
+    new_state = {}
+    changed = 0
+    for page in pages:
+        url = page_url(page, site_url)
+        digest = content_hash(os.path.join(root, *page.split('/')))
+        known = state.get(page)
+
+        if known and known[0] == digest:
+            lastmod = known[1]
+        elif not known and url in previous:
+            # No cache (fresh checkout): trust the date already published
+            lastmod = previous[url]
+        else:
+            lastmod = today
+            changed += 1
+
+        new_state[page] = [digest, lastmod]
+        entries.append((url, lastmod))
+
+    content = render_sitemap(entries)
+    try:
+        with open(sitemap_path, 'r', encoding='utf-8') as f:
+            unchanged = f.read() == content
+    except OSError:
+        unchanged = False
+
+    if not unchanged:
+        tmp_path = f"{sitemap_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, sitemap_path)
+
+    if new_state != state:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{state_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(new_state, f)
+        os.replace(tmp_path, state_path)
+
+    return {'pages': len(entries), 'changed': changed}
+
+
+def main():
+    """Write sitemap.xml for the site."""
+
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+
+    stats = write_sitemap(root)
+
+    print("=" * 60)
+    print("Sitemap Generator")
+    print("=" * 60)
+    print(f"  {stats['pages']} pages, {stats['changed']} with a new lastmod")
+    print(f"  Written: {os.path.join(root, SITEMAP_NAME)}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,366 @@
+"""
+Generate the ICT and chemistry topic pages from content sources
+
+The pages under ict/ and chemie/ share one layout (head, header, nav,
+footer, scripts) in topics/layout.html. Each page only keeps its own
+content in a source file with the same path under topics/, e.g.
+
+    topics/ict/hw/03-procesory-cpu.html  ->  ict/hw/03-procesory-cpu.html
+
+A source starts with a comment holding the page settings, followed by the
+content of <main>:
+
+    <!--
+    title: 3. Procesory (CPU) - HW | Maturita Portál
+    description: Procesory CPU - architektura, jádra, vlákna, cache...
+    fonts: mono          (optional, adds JetBrains Mono)
+    scripts: prism       (optional, adds Prism.js syntax highlighting)
+    -->
+    <nav class="breadcrumb">...
+
+Links in the layout are made relative to each page's depth, so the footer
+and nav can no longer point to the wrong level.
+
+Numbered pages in one directory form a series (ict/psi/11-... to 20-...,
+chemie/01-... to 25-...). Every page of a series gets <link rel="prefetch">
+hints for the previous and next page, so the browser fetches them while
+the page is being read.
+
+Pages are rendered in parallel. A state file remembers the source and
+layout hashes every page was rendered from, so editing one source renders
+one page and editing the layout renders all of them in one pass.
+
+Usage:
+    python generate_topic_pages.py            render changed pages
+    python generate_topic_pages.py --force    render all pages
+    python generate_topic_pages.py --import   create sources from the
+                                              current HTML pages
+"""
+
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TOPICS_DIR = os.path.join(SCRIPT_DIR, "topics")
+LAYOUT_PATH = os.path.join(TOPICS_DIR, "layout.html")
+STATE_PATH = os.path.join(SCRIPT_DIR, ".cache", "topic_pages.json")
+
+# Bump whenever render_page() changes, so all pages are redone
+GENERATOR_VERSION = "2"
+
+# Top-level sections built from topics/<section>/
+SECTIONS = ['ict', 'chemie']
+
+# Main navigation: (label, path from the site root, section it marks active)
+NAV_ITEMS = [
+    ('Domů', 'index.html', None),
+    ('Literatura', 'literatura/index.html', 'literatura'),
+    ('ICT', 'ict/index.html', 'ict'),
+    ('Chemie', 'chemie/index.html', 'chemie'),
+]
+
+FONTS_URL = "https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600&family=Outfit:wght@700;800&display=swap"
+FONTS_MONO_URL = ("https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600"
+                  "&family=JetBrains+Mono:wght@400;500&family=Outfit:wght@700;800&display=swap")
+
+# Extra scripts a source can ask for, loaded before script.js
+EXTRA_SCRIPTS = {
+    'prism': """    <!-- Prism.js for syntax highlighting -->
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-core.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/autoloader/prism-autoloader.min.js"></script>
+"""
+}
+
+FRONT_MATTER_RE = re.compile(r'\A\ufeff?<!--\n(.*?)\n-->\n', re.DOTALL)
+
+# Pages of a series, e.g. chemie/01-vodik-ph.html
+SERIES_PAGE_RE = re.compile(r'^(\d+)-.+\.html$')
+
+
+def parse_source(text):
+    """
+    Split a source into its settings and the content of <main>.
+
+    Returns:
+        Tuple of (settings dictionary, content)
+    """
+    settings = {}
+    match = FRONT_MATTER_RE.match(text)
+    if match:
+        for line in match.group(1).splitlines():
+            key, _, value = line.partition(':')
+            if key.strip():
+                settings[key.strip()] = value.strip()
+        text = text[match.end():]
+    return settings, text
+
+
+def render_nav(section, root):
+    """Render the main navigation list items for a page."""
+    items = []
+    for label, path, item_section in NAV_ITEMS:
+        active = ' class="active"' if item_section == section else ''
+        items.append(f'                    <li><a href="{root}{path}"{active}>{label}</a></li>')
+    return '\n'.join(items)
+
+
+def series_neighbours(paths):
+    """
+    Find the previous and next page of every page in a numbered series.
+
+    Args:
+        paths: Output paths from the site root, with /
+
+    Returns:
+        Dictionary path -> (previous path or None, next path or None)
+    """
+    series = {}
+    for path in paths:
+        directory, _, name = path.rpartition('/')
+        match = SERIES_PAGE_RE.match(name)
+        if match:
+            series.setdefault(directory, []).append((int(match.group(1)), path))
+
+    neighbours = {}
+    for pages in series.values():
+        ordered = [path for _, path in sorted(pages)]
+        for i, path in enumerate(ordered):
+            neighbours[path] = (ordered[i - 1] if i > 0 else None,
+                                ordered[i + 1] if i + 1 < len(ordered) else None)
+    return neighbours
+
+
+def render_prefetch(relative_path, neighbours):
+    """Render the prefetch hints for the neighbours of a page."""
+    directory = relative_path.rpartition('/')[0]
+    links = []
+    for path in neighbours:
+        if path:
+            href = posixpath.relpath(path, directory) if directory else path
+            links.append(f'    <link rel="prefetch" href="{href}">\n')
+    return ''.join(links)
+
+
+def render_page(layout, relative_path, source_text, neighbours=(None, None)):
+    """
+    Render one topic page.
+
+    Args:
+        layout: Contents of topics/layout.html
+        relative_path: Output path from the site root, with /
+        source_text: Contents of the page's source
+        neighbours: Previous and next page of the page's series
+
+    Returns:
+        The page HTML
+    """
+    settings, content = parse_source(source_text)
+    depth = relative_path.count('/')
+    root = '../' * depth
+
+    description = settings.get('description')
+    description_meta = f'    <meta name="description" content="{description}">\n' if description else ''
+
+    scripts = ''.join(EXTRA_SCRIPTS[name.strip()] for name in settings.get('scripts', '').split(',')
+                      if name.strip() in EXTRA_SCRIPTS)
+
+    return Template(layout).substitute(
+        title=settings.get('title', 'Maturita Portál'),
+        description_meta=description_meta,
+        fonts_url=FONTS_MONO_URL if settings.get('fonts') == 'mono' else FONTS_URL,
+        root=root,
+        prefetch=render_prefetch(relative_path, neighbours),
+        nav=render_nav(relative_path.split('/')[0], root),
+        content=content,
+        scripts=f"{scripts}\n" if scripts else ''
+    )
+
+
+def iter_sources(topics_dir=TOPICS_DIR):
+    """
+    Yield the output paths (from the site root, with /) of all sources.
+    """
+    for section in SECTIONS:
+        for current, dirs, files in os.walk(os.path.join(topics_dir, section)):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith('.html'):
+                    yield os.path.relpath(os.path.join(current, name), topics_dir).replace(os.sep, '/')
+
+
+def _hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def load_state(state_path=STATE_PATH):
+    """Load the hashes the pages were last rendered from."""
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_state(state, state_path=STATE_PATH):
+    os.makedirs(os.path.dirname(state_path), exist_ok=True)
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, state_path)
+
+
+def _render_to_file(layout, relative_path, source_text, neighbours, site_root):
+    output_path = os.path.join(site_root, *relative_path.split('/'))
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(render_page(layout, relative_path, source_text, neighbours))
+    return output_path
+
+
+def build_topic_pages(site_root=SCRIPT_DIR, topics_dir=TOPICS_DIR, state_path=STATE_PATH,
+                      force=False, only=None, max_workers=None):
+    """
+    Render the topic pages whose source, layout or series neighbours changed.
+
+    Args:
+        site_root: Directory the pages are written to
+        topics_dir: Directory with layout.html and the sources
+        state_path: File with the hashes of the last render
+        force: Render every page
+        only: Limit the check to these output paths
+        max_workers: Rendering threads (default: CPU count)
+
+    Returns:
+        List of written page paths
+    """
+    with open(os.path.join(topics_dir, "layout.html"), 'r', encoding='utf-8') as f:
+        layout = f.read()
+    layout_hash = _hash(layout + GENERATOR_VERSION)
+
+    state = load_state(state_path)
+    pending = []
+    # Neighbours depend on the whole tree, also when only some paths are checked
+    all_neighbours = series_neighbours(iter_sources(topics_dir))
+
+    for relative_path in (only if only is not None else iter_sources(topics_dir)):
+        source_path = os.path.join(topics_dir, *relative_path.split('/'))
+        try:
+            with open(source_path, 'r', encoding='utf-8') as f:
+                source_text = f.read()
+        except OSError:
+            continue
+
+        neighbours = all_neighbours.get(relative_path, (None, None))
+        source_hash = _hash(source_text + ''.join(path or '' for path in neighbours))
+        output_exists = os.path.exists(os.path.join(site_root, *relative_path.split('/')))
+        if not force and output_exists and state.get(relative_path) == [source_hash, layout_hash]:
+            continue
+
+        pending.append((relative_path, source_text, neighbours))
+        state[relative_path] = [source_hash, layout_hash]
+
+    if not pending:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        written = list(executor.map(
+            lambda item: _render_to_file(layout, *item, site_root), pending
+        ))
+
+    save_state(state, state_path)
+    return written
+
+
+def import_page(html_text):
+    """
+    Turn a complete hand-written page into a source.
+
+    Returns:
+        Source text, or None if the page has no <main>
+    """
+    start = html_text.find('<main>')
+    end = html_text.rfind('</main>')
+    if start < 0 or end < 0:
+        return None
+
+    head = html_text[:start]
+    title = re.search(r'<title>(.*?)</title>', head, re.DOTALL)
+    description = re.search(r'<meta\s+name="description"\s+content="([^"]*)"', head, re.DOTALL)
+
+    lines = ['<!--']
+    if title:
+        lines.append(f"title: {' '.join(title.group(1).split())}")
+    if description:
+        lines.append(f"description: {' '.join(description.group(1).split())}")
+    if 'JetBrains+Mono' in head:
+        lines.append("fonts: mono")
+    if 'prism-core' in html_text[end:]:
+        lines.append("scripts: prism")
+    lines.append('-->')
+
+    return '\n'.join(lines) + '\n' + html_text[start + len('<main>'):end]
+
+
+def import_pages(site_root=SCRIPT_DIR, topics_dir=TOPICS_DIR):
+    """
+    Create sources for the existing pages of SECTIONS that have none yet.
+
+    Returns:
+        Number of sources created
+    """
+    created = 0
+    for section in SECTIONS:
+        for current, dirs, files in os.walk(os.path.join(site_root, section)):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.endswith('.html'):
+                    continue
+                page_path = os.path.join(current, name)
+                relative_path = os.path.relpath(page_path, site_root)
+                source_path = os.path.join(topics_dir, relative_path)
+                if os.path.exists(source_path):
+                    continue
+
+                with open(page_path, 'r', encoding='utf-8-sig') as f:
+                    source = import_page(f.read())
+                if source is None:
+                    print(f"  No <main> found, skipping: {relative_path}")
+                    continue
+
+                os.makedirs(os.path.dirname(source_path), exist_ok=True)
+                with open(source_path, 'w', encoding='utf-8') as f:
+                    f.write(source)
+                created += 1
+    return created
+
+
+def main():
+    """Render the topic pages."""
+
+    print("=" * 60)
+    print("Topic Page Generator")
+    print("=" * 60)
+
+    if '--import' in sys.argv:
+        created = import_pages()
+        print(f"  Sources created: {created}")
+
+    start = time.perf_counter()
+    written = build_topic_pages(force='--force' in sys.argv or '--import' in sys.argv)
+    elapsed = (time.perf_counter() - start) * 1000
+
+    for path in written:
+        print(f"  Rendered: {os.path.relpath(path, SCRIPT_DIR)}")
+    print(f"  {len(written)} of {sum(1 for _ in iter_sources())} pages rendered in {elapsed:.0f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+HTTP Record/Replay for the Maturita Portal Scrapers
+
+scrape_books.py, extract_books_info.py and both download_pdf() functions
+fetch through get() here instead of requests.get(), so they can run
+without the live milujemecestinu.cz:
+
+- Record: with HTTP_RECORD=<cassette dir> set, every response (listing
+  pages, detail pages, PDFs) is stored in the cassette as well
+- Replay: `python http_cassette.py serve <cassette dir>` starts a local
+  stand-in server with the recorded responses; with
+  HTTP_REPLAY=http://127.0.0.1:8765 set, every request goes to it instead
+  of the original host. Latency and bandwidth can be set, so concurrency
+  and caching changes can be measured the same way every time.
+
+Without either variable get() is just requests.get().
+
+A cassette is a directory with index.json (URL -> status, content type,
+body hash) and the bodies named by their SHA-256, each stored once and
+zlib-compressed where that helps (HTML, not PDFs). URLs are keyed
+percent-encoded, the way requests sends them, so file names with spaces
+or diacritics replay as recorded.
+
+Usage:
+    HTTP_RECORD=.cache/cassettes/site python scrape_books.py --full
+    python http_cassette.py serve .cache/cassettes/site [--latency 80] [--bandwidth 500]
+    HTTP_REPLAY=http://127.0.0.1:8765 python scrape_books.py --full
+    python http_cassette.py list .cache/cassettes/site
+
+--latency is in milliseconds per request, --bandwidth in KB/s per
+connection (default: no delay, no limit).
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sys
+import time
+import zlib
+from email.utils import formatdate
+from urllib.parse import urlsplit
+
+import requests
+from requests.utils import requote_uri
+
+INDEX_NAME = "index.json"
+DEFAULT_PORT = 8765
+
+# Compressed bodies are kept if they are at most this part of the original
+MIN_COMPRESSION_RATIO = 0.9
+
+# Bytes sent per write when the bandwidth is limited
+SEND_CHUNK_SIZE = 16 * 1024
+
+STATUS_TEXT = {200: 'OK', 404: 'Not Found', 405: 'Method Not Allowed'}
+
+_cassettes = {}
+
+
+class Cassette:
+    """Recorded responses in a directory."""
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = os.path.join(path, INDEX_NAME)
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.entries = {requote_uri(url): entry for url, entry in json.load(f).items()}
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def _body_path(self, name):
+        return os.path.join(self.path, "bodies", name)
+
+    def record(self, url, status, content_type, body):
+        """Store a response; bodies already in the cassette are not written again."""
+        digest = hashlib.sha256(body).hexdigest()
+        compressed = zlib.compress(body, 9)
+        if len(compressed) <= len(body) * MIN_COMPRESSION_RATIO:
+            name, data = f"{digest}.z", compressed
+        else:
+            name, data = digest, body
+
+        body_path = self._body_path(name)
+        if not os.path.exists(body_path):
+            os.makedirs(os.path.dirname(body_path), exist_ok=True)
+            tmp_path = f"{body_path}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, body_path)
+
+        self.entries[requote_uri(url)] = {
+            'status': status, 'content_type': content_type, 'body': name, 'size': len(body)
+        }
+
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.index_path)
+
+    def load(self, url):
+        """
+        Return (status, content_type, body) of a recorded URL, or None.
+        """
+        entry = self.entries.get(requote_uri(url))
+        if entry is None:
+            return None
+        with open(self._body_path(entry['body']), 'rb') as f:
+            body = f.read()
+        if entry['body'].endswith('.z'):
+            body = zlib.decompress(body)
+        return entry['status'], entry['content_type'], body
+
+
+def replay_url(url, replay_base):
+    """
+    Map an original URL onto the stand-in server:
+    https://host/path?query -> <replay_base>/https/host/path?query
+    """
+    parts = urlsplit(url)
+    target = f"{replay_base.rstrip('/')}/{parts.scheme}/{parts.netloc}{parts.path or '/'}"
+    return f"{target}?{parts.query}" if parts.query else target
+
+
+def original_url(target):
+    """Reverse of replay_url() for a request target (/https/host/path?query)."""
+    path, _, query = target.partition('?')
+    scheme, _, rest = path.lstrip('/').partition('/')
+    host, _, path = rest.partition('/')
+    url = f"{scheme}://{host}/{path}"
+    return f"{url}?{query}" if query else url
+
+
+def get(url, **kwargs):
+    """
+    requests.get() that records or replays according to HTTP_RECORD and
+    HTTP_REPLAY.
+    """
+    replay_base = os.environ.get('HTTP_REPLAY')
+    if replay_base:
+        return requests.get(replay_url(url, replay_base), **kwargs)
+
+    response = requests.get(url, **kwargs)
+
+    record_dir = os.environ.get('HTTP_RECORD')
+    if record_dir:
+        if record_dir not in _cassettes:
+            _cassettes[record_dir] = Cassette(record_dir)
+        _cassettes[record_dir].record(url, response.status_code,
+                                      response.headers.get('Content-Type', 'application/octet-stream'),
+                                      response.content)
+    return response
+
+
+async def _send_throttled(writer, data, bandwidth):
+    """Write data at bandwidth bytes per second (0: as fast as possible)."""
+    if not bandwidth:
+        writer.write(data)
+        await writer.drain()
+        return
+
+    start = time.monotonic()
+    sent = 0
+    for offset in range(0, len(data), SEND_CHUNK_SIZE):
+        chunk = data[offset:offset + SEND_CHUNK_SIZE]
+        writer.write(chunk)
+        await writer.drain()
+        sent += len(chunk)
+        delay = sent / bandwidth - (time.monotonic() - start)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+async def _handle_connection(cassette, reader, writer, latency, bandwidth, stats):
+    """Answer the requests of one connection from the cassette."""
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line.strip():
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3:
+                break
+            method, target, version = parts
+            keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+            if latency:
+                await asyncio.sleep(latency)
+
+            recorded = cassette.load(original_url(target)) if method in ('GET', 'HEAD') else None
+            if recorded is None:
+                status = 405 if method not in ('GET', 'HEAD') else 404
+                content_type = 'text/plain; charset=utf-8'
+                body = f"{STATUS_TEXT[status]}: {original_url(target)} is not in the cassette\n".encode('utf-8')
+                stats['missing'] += 1
+            else:
+                status, content_type, body = recorded
+                stats['served'] += 1
+                stats['bytes'] += len(body)
+
+            head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'Recorded')}\r\n"
+                    f"Date: {formatdate(usegmt=True)}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n").encode('latin-1')
+            await _send_throttled(writer, head + (body if method != 'HEAD' else b''), bandwidth)
+
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(cassette_dir, host='127.0.0.1', port=DEFAULT_PORT, latency_ms=0, bandwidth_kbps=0, stats=None):
+    """
+    Run the stand-in server until cancelled.
+
+    Args:
+        cassette_dir: Cassette to answer from
+        host: Address to listen on
+        port: TCP port
+        latency_ms: Delay before every response
+        bandwidth_kbps: Send rate per connection in KB/s (0: unlimited)
+        stats: Dictionary updated with served, missing and bytes
+    """
+    cassette = Cassette(cassette_dir)
+    stats = stats if stats is not None else {}
+    stats.update(served=0, missing=0, bytes=0)
+    latency = latency_ms / 1000
+    bandwidth = bandwidth_kbps * 1024
+
+    server = await asyncio.start_server(
+        lambda reader, writer: _handle_connection(cassette, reader, writer, latency, bandwidth, stats),
+        host, port, reuse_address=True
+    )
+    async with server:
+        await server.serve_forever()
+
+
+def _option(name, default):
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return float(sys.argv[index + 1])
+    return default
+
+
+def main():
+    """Serve or list a cassette."""
+
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1)
+            if not arg.startswith('--') and not sys.argv[i - 1].startswith('--')]
+    if len(args) < 2 or args[0] not in ('serve', 'list'):
+        print(__doc__)
+        return
+
+    command, cassette_dir = args[0], os.path.abspath(args[1])
+
+    if command == 'list':
+        cassette = Cassette(cassette_dir)
+        bodies = {entry['body'] for entry in cassette.entries.values()}
+        stored = sum(os.path.getsize(cassette._body_path(name)) for name in bodies)
+        total = sum(entry['size'] for entry in cassette.entries.values())
+        for url, entry in sorted(cassette.entries.items()):
+            print(f"  {entry['status']} {entry['size']:>9} {url}")
+        print(f"{len(cassette.entries)} responses, {total / 1024:.0f} KB, "
+              f"{stored / 1024:.0f} KB on disk in {len(bodies)} bodies")
+        return
+
+    port = int(_option('--port', DEFAULT_PORT))
+    latency_ms = _option('--latency', 0)
+    bandwidth_kbps = _option('--bandwidth', 0)
+
+    print("=" * 60)
+    print("HTTP Replay Server")
+    print("=" * 60)
+    print(f"  Cassette: {cassette_dir}")
+    print(f"  Latency: {latency_ms:.0f} ms, bandwidth: "
+          f"{f'{bandwidth_kbps:.0f} KB/s' if bandwidth_kbps else 'unlimited'}")
+    print(f"  Use: HTTP_REPLAY=http://127.0.0.1:{port} python scrape_books.py")
+    print("=" * 60)
+
+    stats = {}
+    try:
+        asyncio.run(serve(cassette_dir, port=port, latency_ms=latency_ms, bandwidth_kbps=bandwidth_kbps, stats=stats))
+    except KeyboardInterrupt:
+        print(f"\nServed {stats['served']} responses ({stats['bytes'] / 1024:.0f} KB), "
+              f"{stats['missing']} not in the cassette")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Near-Duplicate Detection for Maturita Portal
+
+Finds texts in literatura/text that are the same work under different
+slugs (e.g. rur and r-u-r) or re-uploads of the same analysis:
+
+1. Each text becomes a set of word shingles (SHINGLE_SIZE consecutive words)
+2. A MinHash signature of NUM_PERM values estimates the Jaccard similarity
+   of two shingle sets
+3. Locality-sensitive hashing splits every signature into BANDS bands; only
+   texts sharing a whole band are compared, so the cost grows with the
+   number of texts instead of the number of pairs
+
+generate_book_pages.py uses it to skip rendering a second page for a work
+that already has one. Run it directly to list the duplicate groups:
+
+    python near_duplicates.py [threshold]
+
+Requirements:
+    pip install numpy
+"""
+
+import os
+import re
+import sys
+import time
+import unicodedata
+import zlib
+
+try:
+    import numpy as np
+except ImportError:
+    print("Installing numpy...")
+    os.system("pip install numpy")
+    import numpy as np
+
+from related_books import load_texts
+
+# Words per shingle
+SHINGLE_SIZE = 5
+
+# Signature length, BANDS * ROWS_PER_BAND
+NUM_PERM = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERM // BANDS
+
+# Estimated Jaccard similarity from which two texts count as duplicates
+THRESHOLD = 0.8
+
+# Mersenne prime for the universal hash functions
+PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+WORD_RE = re.compile(r'[^\W_]+')
+
+# Fixed seed, signatures must be comparable between runs
+_rng = np.random.RandomState(1)
+PERM_A = _rng.randint(1, MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, MAX_HASH, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """
+    Return the 32-bit hashes of all word shingles of a text.
+
+    Words are lowercased and stripped of diacritics, so PDFs that differ
+    only in encoding or layout give the same shingles.
+    """
+    text = unicodedata.normalize('NFKD', text.lower())
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    words = WORD_RE.findall(text)
+
+    if len(words) < size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))} if words else set()
+
+    return {zlib.crc32(' '.join(words[i:i + size]).encode('utf-8'))
+            for i in range(len(words) - size + 1)}
+
+
+def minhash_signature(shingle_hashes):
+    """
+    Compute the MinHash signature of a set of shingle hashes.
+
+    Returns:
+        numpy array of NUM_PERM values (all MAX_HASH for an empty set)
+    """
+    if not shingle_hashes:
+        return np.full(NUM_PERM, MAX_HASH, dtype=np.uint64)
+
+    values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+    # (a * x + b) mod p for every permutation and shingle at once; a and x
+    # are below 2**32, so the product fits into 64 bits
+    hashed = (np.outer(PERM_A, values) + PERM_B[:, None]) % np.uint64(PRIME)
+    return (hashed & np.uint64(MAX_HASH)).min(axis=1)
+
+
+def estimate_similarity(signature_a, signature_b):
+    """Estimate the Jaccard similarity of two texts from their signatures."""
+    return float(np.mean(signature_a == signature_b))
+
+
+class MinHashIndex:
+    """
+    LSH index of MinHash signatures.
+
+    Each signature is stored in one bucket per band; texts that share a
+    bucket in any band are candidate duplicates.
+    """
+
+    def __init__(self, bands=BANDS, rows=ROWS_PER_BAND):
+        self.bands = bands
+        self.rows = rows
+        self.buckets = [{} for _ in range(bands)]
+        self.signatures = {}
+
+    def _band_keys(self, signature):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows].tobytes()
+
+    def add(self, key, signature):
+        """Add a signature to the index."""
+        self.signatures[key] = signature
+        for band, band_key in self._band_keys(signature):
+            self.buckets[band].setdefault(band_key, []).append(key)
+
+    def candidates(self, signature):
+        """Return the keys sharing at least one band with a signature."""
+        found = set()
+        for band, band_key in self._band_keys(signature):
+            found.update(self.buckets[band].get(band_key, ()))
+        return found
+
+    def query(self, signature, threshold=THRESHOLD):
+        """
+        Find indexed texts similar to a signature.
+
+        Returns:
+            List of (key, estimated similarity), most similar first
+        """
+        matches = []
+        for key in self.candidates(signature):
+            similarity = estimate_similarity(signature, self.signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+
+def build_index(texts):
+    """
+    Build an LSH index over a corpus.
+
+    Args:
+        texts: Dictionary slug -> text
+
+    Returns:
+        MinHashIndex with one signature per slug
+    """
+    index = MinHashIndex()
+    for slug, text in texts.items():
+        index.add(slug, minhash_signature(shingles(text)))
+    return index
+
+
+def add_unless_duplicate(index, key, text, threshold=THRESHOLD):
+    """
+    Add a text to an index unless it duplicates a text already there.
+
+    Returns:
+        (key, estimated similarity) of the indexed duplicate, or None if
+        the text was added
+    """
+    signature = minhash_signature(shingles(text))
+    matches = [match for match in index.query(signature, threshold) if match[0] != key]
+    if matches:
+        return matches[0]
+    index.add(key, signature)
+    return None
+
+
+def duplicate_pairs(index, threshold=THRESHOLD):
+    """
+    Find all pairs of near-duplicate texts in an index.
+
+    Returns:
+        List of (slug, slug, estimated similarity), each pair once
+    """
+    pairs = []
+    for slug, signature in index.signatures.items():
+        for other, similarity in index.query(signature, threshold):
+            if slug < other:
+                pairs.append((slug, other, similarity))
+    return sorted(pairs)
+
+
+def find_near_duplicates(texts, threshold=THRESHOLD):
+    """
+    Find all pairs of near-duplicate texts.
+
+    Args:
+        texts: Dictionary slug -> text
+        threshold: Minimum estimated Jaccard similarity
+
+    Returns:
+        List of (slug, slug, estimated similarity), each pair once
+    """
+    return duplicate_pairs(build_index(texts), threshold)
+
+
+def group_duplicates(pairs):
+    """
+    Merge duplicate pairs into groups of slugs (a~b and b~c -> a, b, c).
+
+    Returns:
+        List of sorted slug lists
+    """
+    parent = {}
+
+    def root(slug):
+        while parent.setdefault(slug, slug) != slug:
+            parent[slug] = parent[parent[slug]]
+            slug = parent[slug]
+        return slug
+
+    for slug, other, _ in pairs:
+        parent[root(slug)] = root(other)
+
+    groups = {}
+    for slug in parent:
+        groups.setdefault(root(slug), []).append(slug)
+    return sorted(sorted(group) for group in groups.values())
+
+
+def main():
+    """Print the near-duplicate groups in literatura/text."""
+
+    threshold = float(sys.argv[1]) if len(sys.argv) > 1 else THRESHOLD
+
+    texts = load_texts()
+
+    start = time.perf_counter()
+    index = build_index(texts)
+    signature_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pairs = duplicate_pairs(index, threshold)
+    candidate_count = sum(len(index.candidates(signature)) - 1
+                          for signature in index.signatures.values()) // 2
+    lsh_time = time.perf_counter() - start
+
+    print("=" * 60)
+    print("Near-Duplicate Texts")
+    print("=" * 60)
+
+    similarities = {(slug, other): similarity for slug, other, similarity in pairs}
+    for group in group_duplicates(pairs):
+        print(f"  {', '.join(group)}")
+        for i, slug in enumerate(group):
+            for other in group[i + 1:]:
+                if (slug, other) in similarities:
+                    print(f"    {slug} ~ {other}: {similarities[(slug, other)]:.2f}")
+    if not pairs:
+        print("  No near-duplicates found")
+
+    all_pairs = len(texts) * (len(texts) - 1) // 2
+    print()
+    print(f"Texts: {len(texts)}, threshold: {threshold:.2f}")
+    print(f"Candidate pairs: {candidate_count} of {all_pairs}")
+    print(f"Signatures: {signature_time:.2f} s, LSH + verification: {lsh_time:.3f} s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
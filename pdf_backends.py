@@ -0,0 +1,294 @@
+"""
+PDF Extraction Backends for Maturita Portal
+
+Wraps the PDF text extractors we can use behind one interface:
+
+    pdftotext  - poppler's pdftotext/pdfinfo binaries, if installed
+    pypdf      - pip install pypdf
+    pypdf2     - pip install pypdf2
+    pdfminer   - pip install pdfminer.six
+
+get_backend() picks the first installed backend in PREFERRED_BACKENDS
+(roughly fastest first). Set the PDF_BACKEND environment variable to
+force a specific one.
+
+Run it directly to compare speed and Czech diacritics quality of every
+installed backend on literatura/pdfs:
+
+    python pdf_backends.py [max_pdfs]
+"""
+
+import importlib.util
+import os
+import re
+import shutil
+import subprocess
+import sys
+import time
+import unicodedata
+from collections import namedtuple
+
+Backend = namedtuple('Backend', ['name', 'available', 'page_count', 'iter_pages'])
+
+# Tried in this order when PDF_BACKEND is not set
+PREFERRED_BACKENDS = ['pdftotext', 'pypdf', 'pypdf2', 'pdfminer']
+
+CZECH_LETTERS = set('áčďéěíňóřšťúůýžÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ')
+
+# Spacing accents and replacement characters left behind by broken extraction
+BROKEN_MARKS = set('ˇ´˚¨�')
+
+
+def _module_available(module):
+    return importlib.util.find_spec(module) is not None
+
+
+def _iter_reader_pages(reader_class, pdf_path, start, end):
+    reader = reader_class(pdf_path)
+    pages = reader.pages
+    end = len(pages) if end is None else end
+    for i in range(start, end):
+        yield pages[i].extract_text() or ""
+
+
+# pypdf
+
+def _pypdf_page_count(pdf_path):
+    from pypdf import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def _pypdf_iter_pages(pdf_path, start=0, end=None):
+    from pypdf import PdfReader
+    return _iter_reader_pages(PdfReader, pdf_path, start, end)
+
+
+# PyPDF2
+
+def _pypdf2_page_count(pdf_path):
+    from PyPDF2 import PdfReader
+    return len(PdfReader(pdf_path).pages)
+
+
+def _pypdf2_iter_pages(pdf_path, start=0, end=None):
+    from PyPDF2 import PdfReader
+    return _iter_reader_pages(PdfReader, pdf_path, start, end)
+
+
+# pdfminer.six
+
+def _pdfminer_page_count(pdf_path):
+    from pdfminer.pdfpage import PDFPage
+    with open(pdf_path, 'rb') as f:
+        return sum(1 for _ in PDFPage.get_pages(f))
+
+
+def _pdfminer_iter_pages(pdf_path, start=0, end=None):
+    from pdfminer.high_level import extract_pages
+    from pdfminer.layout import LTTextContainer
+
+    page_numbers = None
+    if start > 0 or end is not None:
+        if end is None:
+            end = _pdfminer_page_count(pdf_path)
+        page_numbers = range(start, end)
+
+    for layout in extract_pages(pdf_path, page_numbers=page_numbers):
+        yield "".join(element.get_text() for element in layout
+                      if isinstance(element, LTTextContainer))
+
+
+# pdftotext (poppler-utils)
+
+def _pdftotext_available():
+    return shutil.which('pdftotext') is not None and shutil.which('pdfinfo') is not None
+
+
+def _pdftotext_page_count(pdf_path):
+    result = subprocess.run(['pdfinfo', pdf_path], capture_output=True, check=True)
+    match = re.search(r'^Pages:\s+(\d+)', result.stdout.decode('utf-8', errors='replace'), re.MULTILINE)
+    if not match:
+        raise ValueError(f"pdfinfo did not report a page count for {pdf_path}")
+    return int(match.group(1))
+
+
+def _pdftotext_iter_pages(pdf_path, start=0, end=None):
+    if end is None:
+        end = _pdftotext_page_count(pdf_path)
+    if start >= end:
+        return
+
+    result = subprocess.run(
+        ['pdftotext', '-enc', 'UTF-8', '-f', str(start + 1), '-l', str(end), pdf_path, '-'],
+        capture_output=True, check=True
+    )
+
+    # pdftotext ends every page with a form feed
+    pages = result.stdout.decode('utf-8', errors='replace').split('\f')
+    for i in range(end - start):
+        yield pages[i] if i < len(pages) else ""
+
+
+BACKENDS = {
+    'pdftotext': Backend('pdftotext', _pdftotext_available, _pdftotext_page_count, _pdftotext_iter_pages),
+    'pypdf': Backend('pypdf', lambda: _module_available('pypdf'), _pypdf_page_count, _pypdf_iter_pages),
+    'pypdf2': Backend('pypdf2', lambda: _module_available('PyPDF2'), _pypdf2_page_count, _pypdf2_iter_pages),
+    'pdfminer': Backend('pdfminer', lambda: _module_available('pdfminer'), _pdfminer_page_count, _pdfminer_iter_pages),
+}
+
+
+def available_backends():
+    """
+    Return the names of all installed backends, in preference order.
+    """
+    return [name for name in PREFERRED_BACKENDS if BACKENDS[name].available()]
+
+
+def get_backend(name=None):
+    """
+    Get a PDF extraction backend.
+
+    Args:
+        name: Backend name; defaults to the PDF_BACKEND environment
+              variable, then to the first installed backend
+
+    Returns:
+        The Backend
+
+    Raises:
+        ValueError: If the requested backend is unknown or not installed
+        RuntimeError: If no backend is installed at all
+    """
+    name = name or os.environ.get('PDF_BACKEND')
+
+    if name:
+        backend = BACKENDS.get(name.lower())
+        if backend is None:
+            raise ValueError(f"Unknown PDF backend: {name} (choose from {', '.join(BACKENDS)})")
+        if not backend.available():
+            raise ValueError(f"PDF backend {name} is not installed")
+        return backend
+
+    for candidate in available_backends():
+        return BACKENDS[candidate]
+
+    raise RuntimeError("No PDF backend installed; run: pip install pypdf")
+
+
+def diacritics_quality(text):
+    """
+    Score how well Czech diacritics survived extraction.
+
+    Returns:
+        Tuple of (share of letters that are Czech accented letters,
+                  number of detached accents / replacement characters)
+    """
+    letters = 0
+    accented = 0
+    broken = 0
+
+    for char in text:
+        if char.isalpha():
+            letters += 1
+            if char in CZECH_LETTERS:
+                accented += 1
+        elif char in BROKEN_MARKS or unicodedata.combining(char):
+            broken += 1
+
+    return (accented / letters if letters else 0.0), broken
+
+
+def benchmark_backend(backend, pdf_paths):
+    """
+    Extract every PDF with one backend and measure speed and quality.
+
+    Returns:
+        Dictionary with pages, seconds, accent_ratio, broken and errors
+    """
+    pages = 0
+    errors = 0
+    texts = []
+    start = time.perf_counter()
+
+    for pdf_path in pdf_paths:
+        try:
+            page_texts = list(backend.iter_pages(pdf_path))
+        except Exception:
+            errors += 1
+            continue
+        pages += len(page_texts)
+        texts.extend(page_texts)
+
+    seconds = time.perf_counter() - start
+    accent_ratio, broken = diacritics_quality("".join(texts))
+
+    return {
+        'pages': pages,
+        'seconds': seconds,
+        'accent_ratio': accent_ratio,
+        'broken': broken,
+        'errors': errors
+    }
+
+
+def recommend_backend(results):
+    """
+    Pick the fastest backend whose diacritics are as good as the best one.
+
+    Args:
+        results: Dictionary of backend name -> benchmark_backend() result
+
+    Returns:
+        Backend name, or None if no backend extracted anything
+    """
+    usable = {name: r for name, r in results.items() if r['pages'] and not r['errors']}
+    if not usable:
+        return None
+
+    best_ratio = max(r['accent_ratio'] for r in usable.values())
+    fewest_broken = min(r['broken'] for r in usable.values())
+
+    # Allow a little slack, extractors disagree on headers and ligatures
+    good = [name for name, r in usable.items()
+            if r['accent_ratio'] >= 0.95 * best_ratio and r['broken'] <= fewest_broken]
+
+    return max(good, key=lambda name: usable[name]['pages'] / max(usable[name]['seconds'], 1e-9))
+
+
+def main():
+    """Benchmark every installed backend on literatura/pdfs."""
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    pdf_dir = os.path.join(script_dir, "literatura", "pdfs")
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    pdf_paths = sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir)
+                       if name.endswith('.pdf'))[:limit]
+
+    print("=" * 70)
+    print("PDF Backend Benchmark")
+    print("=" * 70)
+    print(f"PDFs: {len(pdf_paths)}")
+    print(f"Installed backends: {', '.join(available_backends()) or 'none'}")
+    print()
+    print(f"{'backend':<12} {'pages':>6} {'pages/s':>9} {'accented':>9} {'broken':>7} {'errors':>7}")
+
+    results = {}
+    for name in available_backends():
+        result = benchmark_backend(BACKENDS[name], pdf_paths)
+        results[name] = result
+        rate = result['pages'] / max(result['seconds'], 1e-9)
+        print(f"{name:<12} {result['pages']:>6} {rate:>9.1f} {result['accent_ratio']:>8.2%} "
+              f"{result['broken']:>7} {result['errors']:>7}")
+
+    print()
+    recommended = recommend_backend(results)
+    if recommended:
+        print(f"Recommended: PDF_BACKEND={recommended}")
+    else:
+        print("No backend extracted any text.")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+PDF Page Extraction for Maturita Portal
+
+Extracts the text of a PDF page by page with the backend chosen by
+pdf_backends.get_backend(). Long documents are split into page ranges
+that are extracted in separate worker processes and stitched back
+together in page order, so one very long book does not hold up a bulk
+run.
+
+Used by extract_pdf_texts.py and generate_book_pages.py through
+extraction_cache.py. Run it directly to compare sequential and parallel
+extraction on literatura/pdfs.
+"""
+
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pdf_backends import get_backend
+from text_normalizer import normalize_pages
+
+# Bump whenever the text cleanup changes, so cached texts are redone
+EXTRACTOR_VERSION = "2"
+
+# Documents with at least this many pages are extracted in parallel
+PARALLEL_PAGE_THRESHOLD = 150
+
+# Each worker gets this many page ranges, so slow pages even out
+RANGES_PER_WORKER = 2
+
+
+def extractor_version(backend=None):
+    """
+    Identify the backend and cleanup that produce extract_text() output.
+    """
+    return f"{get_backend(backend).name}-{EXTRACTOR_VERSION}"
+
+
+def extract_page_range(pdf_path, start, end, backend=None):
+    """
+    Extract the text of pages [start, end) of a PDF.
+
+    Runs inside a worker process, so it opens its own reader.
+
+    Returns:
+        List of page texts ("" for pages without text)
+    """
+    return list(get_backend(backend).iter_pages(pdf_path, start, end))
+
+
+def split_page_ranges(page_count, parts):
+    """
+    Split page_count pages into at most `parts` contiguous (start, end) ranges.
+    """
+    parts = max(1, min(parts, page_count))
+    size, extra = divmod(page_count, parts)
+
+    ranges = []
+    start = 0
+    for i in range(parts):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append((start, end))
+        start = end
+
+    return ranges
+
+
+def extract_pages(pdf_path, max_workers=None, threshold=PARALLEL_PAGE_THRESHOLD, backend=None):
+    """
+    Extract the text of every page of a PDF, in page order.
+
+    Args:
+        pdf_path: Path to the PDF file
+        max_workers: Number of worker processes (default: CPU count)
+        threshold: Page count from which extraction runs in parallel
+        backend: Backend name (default: see pdf_backends.get_backend())
+
+    Returns:
+        List of page texts ("" for pages without text)
+    """
+    backend = get_backend(backend)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    page_count = backend.page_count(pdf_path)
+
+    if page_count < threshold or max_workers < 2:
+        return list(backend.iter_pages(pdf_path))
+
+    ranges = split_page_ranges(page_count, max_workers * RANGES_PER_WORKER)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(extract_page_range, pdf_path, start, end, backend.name)
+                   for start, end in ranges]
+        # Futures are collected in submission order, which is page order
+        page_texts = []
+        for future in futures:
+            page_texts.extend(future.result())
+
+    return page_texts
+
+
+def extract_text(pdf_path, max_workers=None, backend=None):
+    """
+    Extract the cleaned-up text of a whole PDF.
+
+    Returns:
+        Tuple of (text, page_count)
+    """
+    page_texts = extract_pages(pdf_path, max_workers=max_workers, backend=backend)
+
+    # Drop headers and page numbers, join hyphenated words, reflow paragraphs
+    full_text = normalize_pages(page_texts)
+
+    return full_text, len(page_texts)
+
+
+def main():
+    """Compare sequential and parallel extraction on the largest PDFs."""
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    pdf_dir = os.path.join(script_dir, "literatura", "pdfs")
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    pdfs = sorted(
+        (os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir) if name.endswith('.pdf')),
+        key=os.path.getsize,
+        reverse=True
+    )[:limit]
+
+    print("=" * 70)
+    print("PDF Page Extraction Benchmark")
+    print("=" * 70)
+    print(f"{'PDF':<40} {'pages':>6} {'seq (s)':>9} {'par (s)':>9}")
+
+    for pdf_path in pdfs:
+        start = time.perf_counter()
+        sequential = extract_pages(pdf_path, threshold=sys.maxsize)
+        seq_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        parallel = extract_pages(pdf_path, threshold=0)
+        par_time = time.perf_counter() - start
+
+        status = "" if parallel == sequential else "  MISMATCH"
+        name = os.path.basename(pdf_path)
+        print(f"{name:<40} {len(sequential):>6} {seq_time:>9.2f} {par_time:>9.2f}{status}")
+
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
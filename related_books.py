@@ -0,0 +1,265 @@
+"""
+Related Books for Maturita Portal
+
+Finds similar works from the full texts in literatura/text:
+
+1. Normalizes the Czech text (lowercase, stopwords removed, common case
+   endings stripped, diacritics folded)
+2. Builds a sparse TF-IDF matrix over the whole corpus; terms found in
+   more than MAX_DF of the texts (the headings every rozbor shares) are dropped
+3. Multiplies the matrix with its transpose in row batches and keeps the
+   top-k most similar books per book
+
+generate_book_pages.py bakes the results into each book page. Run it
+directly to print the neighbours and the build cost:
+
+    python related_books.py [k]
+
+Requirements:
+    pip install numpy scipy
+"""
+
+import math
+import os
+import re
+import sys
+import time
+import unicodedata
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError:
+    print("Installing numpy and scipy...")
+    os.system("pip install numpy scipy")
+    import numpy as np
+    from scipy import sparse
+
+TEXT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "literatura", "text")
+
+# Number of related books per book
+TOP_K = 5
+
+# Terms in more than this share of texts carry no information
+MAX_DF = 0.5
+
+# Terms must appear in at least this many texts
+MIN_DF = 2
+
+# Rows multiplied at once, bounds memory to BATCH_SIZE x books similarities
+BATCH_SIZE = 512
+
+# Texts this similar are copies of each other, not recommendations
+DUPLICATE_SIMILARITY = 0.9
+
+CZECH_STOPWORDS = set("""
+a aby aj ale ani aniž ano asi až bez bude budem budeš by byl byla byli bylo být co
+což či další do ho i já jak jako je jeho jej její jejich jen jenž ještě ji jiné již
+jsem jsi jsme jsou jste k kam kde kdo kdy když ke která které kterou který kteří ku
+ma má mají mé mezi mi mít mně mnou můj může my na nad nám napište náš naši ne nebo
+nechť něco nějak není než nic nich ním o od ode on ona oni ono ony po pod podle pokud
+pouze proč pro proto protože před přes při s se si sice své svůj svých svým tak také
+tam te tedy ten tento této tím to tohle toho tomto tomu toto tu tuto ty tyto u už v
+vám váš ve více však všechen vy z za zde ze že
+""".split())
+
+# Common Czech case and verb endings, longest first
+CZECH_SUFFIXES = sorted("""
+ových ovými ovém ového ovému ami ách ata ech ého ému emi ích ími iho imu ích ými ové
+ou em es ům ím ám ých ém í é á a e i o u y ů ý ě
+""".split(), key=len, reverse=True)
+
+WORD_RE = re.compile(r'[^\W\d_]+')
+
+
+def fold(word):
+    """Remove diacritics from a word."""
+    return ''.join(char for char in unicodedata.normalize('NFKD', word)
+                   if not unicodedata.combining(char))
+
+
+def stem(word):
+    """Strip a common Czech ending, keeping at least three letters."""
+    for suffix in CZECH_SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def normalize_tokens(text):
+    """
+    Turn a Czech text into normalized terms for TF-IDF.
+    """
+    terms = []
+    for word in WORD_RE.findall(text.lower()):
+        if len(word) < 3 or word in CZECH_STOPWORDS:
+            continue
+        terms.append(fold(stem(word)))
+    return terms
+
+
+def load_texts(text_dir=TEXT_DIR):
+    """
+    Load all texts, keyed by slug (file name without .txt).
+    """
+    texts = {}
+    for name in sorted(os.listdir(text_dir)):
+        if name.endswith('.txt'):
+            with open(os.path.join(text_dir, name), 'r', encoding='utf-8') as f:
+                texts[name[:-4]] = f.read()
+    return texts
+
+
+def build_tfidf(documents, min_df=MIN_DF, max_df=MAX_DF):
+    """
+    Build an L2-normalized TF-IDF matrix.
+
+    Args:
+        documents: List of texts
+
+    Returns:
+        scipy.sparse CSR matrix with one row per document
+    """
+    counts = []
+    document_frequency = {}
+
+    for text in documents:
+        term_counts = {}
+        for term in normalize_tokens(text):
+            term_counts[term] = term_counts.get(term, 0) + 1
+        counts.append(term_counts)
+        for term in term_counts:
+            document_frequency[term] = document_frequency.get(term, 0) + 1
+
+    n_docs = len(documents)
+    max_count = max_df * n_docs
+    vocabulary = {}
+    idf = []
+    for term, df in document_frequency.items():
+        if min_df <= df <= max_count:
+            vocabulary[term] = len(vocabulary)
+            idf.append(math.log((1 + n_docs) / (1 + df)) + 1)
+
+    indptr = [0]
+    indices = []
+    data = []
+    for term_counts in counts:
+        for term, count in term_counts.items():
+            column = vocabulary.get(term)
+            if column is not None:
+                indices.append(column)
+                # Sublinear term frequency, long texts should not dominate
+                data.append((1 + math.log(count)) * idf[column])
+        indptr.append(len(indices))
+
+    matrix = sparse.csr_matrix(
+        (np.array(data, dtype=np.float32), np.array(indices, dtype=np.int32), np.array(indptr, dtype=np.int64)),
+        shape=(n_docs, len(vocabulary))
+    )
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms).dot(matrix).tocsr()
+
+
+def top_k_neighbours(matrix, k=TOP_K, candidates=None, batch_size=BATCH_SIZE):
+    """
+    Find the k most similar rows for every row of a normalized matrix.
+
+    Args:
+        matrix: Output of build_tfidf()
+        k: Number of neighbours per row
+        candidates: Boolean array, rows that may be returned as neighbours
+        batch_size: Rows multiplied at once
+
+    Returns:
+        List (one per row) of lists of (row index, cosine similarity)
+    """
+    n_rows = matrix.shape[0]
+    if candidates is None:
+        candidates = np.ones(n_rows, dtype=bool)
+
+    transposed = matrix.T.tocsc()
+    neighbours = []
+
+    for start in range(0, n_rows, batch_size):
+        end = min(start + batch_size, n_rows)
+        similarities = (matrix[start:end] @ transposed).toarray()
+
+        # Never recommend the book itself, copies of it or non-candidates
+        similarities[np.arange(end - start), np.arange(start, end)] = -1
+        similarities[:, ~candidates] = -1
+        similarities[similarities >= DUPLICATE_SIMILARITY] = -1
+
+        count = min(k, n_rows - 1)
+        if count <= 0:
+            neighbours.extend([] for _ in range(end - start))
+            continue
+
+        top = np.argpartition(-similarities, count - 1, axis=1)[:, :count]
+        for row, columns in enumerate(top):
+            ranked = sorted(columns, key=lambda column: -similarities[row, column])
+            neighbours.append([(int(column), float(similarities[row, column]))
+                               for column in ranked if similarities[row, column] > 0])
+
+    return neighbours
+
+
+def compute_related(texts, k=TOP_K, linkable=None):
+    """
+    Compute related books for a corpus.
+
+    Args:
+        texts: Dictionary slug -> text
+        k: Number of related books per book
+        linkable: Slugs that may be recommended (e.g. books with a page);
+                  all slugs if None
+
+    Returns:
+        Dictionary slug -> list of (related slug, similarity), best first
+    """
+    slugs = list(texts)
+    if len(slugs) < 2:
+        return {slug: [] for slug in slugs}
+
+    matrix = build_tfidf([texts[slug] for slug in slugs])
+    candidates = None
+    if linkable is not None:
+        candidates = np.array([slug in linkable for slug in slugs])
+
+    neighbours = top_k_neighbours(matrix, k, candidates)
+    return {slug: [(slugs[column], score) for column, score in neighbours[row]]
+            for row, slug in enumerate(slugs)}
+
+
+def main():
+    """Print related books for literatura/text and the build cost."""
+
+    k = int(sys.argv[1]) if len(sys.argv) > 1 else TOP_K
+
+    start = time.perf_counter()
+    texts = load_texts()
+    matrix = build_tfidf(list(texts.values()))
+    tfidf_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    neighbours = top_k_neighbours(matrix, k)
+    knn_time = time.perf_counter() - start
+
+    slugs = list(texts)
+    memory = matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+
+    print("=" * 70)
+    print("Related Books")
+    print("=" * 70)
+    for row, slug in enumerate(slugs):
+        related = ", ".join(f"{slugs[column]} ({score:.2f})" for column, score in neighbours[row])
+        print(f"{slug}: {related or '-'}")
+    print()
+    print(f"Books: {matrix.shape[0]}, terms: {matrix.shape[1]}, non-zeros: {matrix.nnz}")
+    print(f"TF-IDF: {tfidf_time:.2f} s, top-{k}: {knn_time:.3f} s, matrix: {memory / 1024:.0f} KB")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    main()
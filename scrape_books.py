@@ -1,79 +1,73 @@
-import requests
 from bs4 import BeautifulSoup
 import re
+import sys
 import time
 
-def scrape_book_list():
-    """Scrape the main list page to get all book URLs"""
+import http_cassette
+from book_page_parser import find_label, parse_detail_page
+from crawl_frontier import discover_items, load_seen, save_seen
+
+# Name of the crawl state file that remembers scraped books
+STATE_NAME = "scrape_books"
+
+def fetch_soup(url):
+    """Fetch a page and parse it with BeautifulSoup"""
+    response = http_cassette.get(url)
+    response.raise_for_status()
+    return BeautifulSoup(response.content, 'html.parser')
+
+def scrape_book_list(seen=None):
+    """Scrape the listing pages to get the URLs of all new books"""
     url = "https://www.milujemecestinu.cz/index.php?mnu=rozbory-literarnich-del&lid=cs&mod=mod-tournaments3&shw=preview"
     
     try:
-        response = requests.get(url)
-        response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # Find all links to book detail pages
-        book_links = []
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
-            if 'mod=mod-tournaments3' in href and 'op=archive' in href and 'itemid=' in href:
-                full_url = href if href.startswith('http') else f"https://www.milujemecestinu.cz/{href}"
-                book_title = link.get_text(strip=True)
-                book_links.append({
-                    'title': book_title,
-                    'url': full_url
-                })
-        
-        return book_links
+        # Links are canonicalized, deduped by itemid and followed across
+        # pagination; books scraped in earlier runs are skipped
+        return discover_items(
+            url,
+            fetch_soup,
+            lambda href: 'mod=mod-tournaments3' in href and 'op=archive' in href and 'itemid=' in href,
+            seen
+        )
     except Exception as e:
         print(f"Error scraping book list: {e}")
         return []
 
 def scrape_book_details(book_url):
-    """Scrape individual book page for author, genre, and PDF URL"""
+    """Scrape individual book page for author, genre, and PDF URL
+    
+    Returns None if the page could not be fetched, so the book is retried
+    on the next run instead of being remembered without its details.
+    """
     try:
-        response = requests.get(book_url)
+        response = http_cassette.get(book_url)
         response.raise_for_status()
-        soup = BeautifulSoup(response.content, 'html.parser')
+        
+        # Links and text are collected in a single pass over the page
+        page = parse_detail_page(response.content)
         
         # Find PDF link
         pdf_url = None
-        for link in soup.find_all('a', href=True):
-            href = link.get('href')
+        for href in page['links']:
             if href.endswith('.pdf'):
                 pdf_url = href if href.startswith('http') else f"https://www.milujemecestinu.cz{href}"
                 break
         
         # Try to extract author and genre from the page content
-        author = "Nezjištěno"
-        genre = "Nezjištěno"
-        
-        # Look for author information in various possible locations
-        page_text = soup.get_text()
-        
         # Common patterns for author
         author_patterns = [
             r'Autor:\s*([^\n]+)',
             r'Spisovate[lí]:\s*([^\n]+)',
         ]
         
-        for pattern in author_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
-            if match:
-                author = match.group(1).strip()
-                break
-        
         # Common patterns for genre
         genre_patterns = [
             r'Žánr:\s*([^\n]+)',
             r'Literární druh:\s*([^\n]+)',
         ]
         
-        for pattern in genre_patterns:
-            match = re.search(pattern, page_text, re.IGNORECASE)
-            if match:
-                genre = match.group(1).strip()
-                break
+        author = find_label(page['text'], author_patterns, re.IGNORECASE) or "Nezjištěno"
+        genre = find_label(page['text'], genre_patterns, re.IGNORECASE) or "Nezjištěno"
         
         return {
             'author': author,
@@ -82,18 +76,37 @@ def scrape_book_details(book_url):
         }
     except Exception as e:
         print(f"Error scraping book details from {book_url}: {e}")
-        return {
-            'author': 'Nezjištěno',
-            'genre': 'Nezjištěno',
-            'pdf_url': None
-        }
+        return None
 
 def main():
     print("Zacinam sber informaci o knihach...")
     
-    # Get all book links
-    books = scrape_book_list()
-    print(f"Nalezeno {len(books)} knih\n")
+    # Books scraped in earlier runs; pass --full to scrape everything again
+    seen = {} if '--full' in sys.argv else load_seen(STATE_NAME)
+    
+    # Get all new book links
+    books = scrape_book_list(seen)
+    print(f"Nalezeno {len(books)} novych knih\n")
+    
+    for i, book in enumerate(books, 1):
+        print(f"[{i}/{len(books)}] Zpracovavam: {book['title']}")
+        
+        # Get details for each book
+        details = scrape_book_details(book['url'])
+        if details is None:
+            # Not remembered, so the next run tries again
+            print("  Preskoceno, zkusi se znovu pri dalsim behu")
+        else:
+            seen[book['key']] = {
+                'title': book['title'],
+                'author': details['author'],
+                'genre': details['genre'],
+                'pdf_url': details['pdf_url']
+            }
+            save_seen(STATE_NAME, seen)
+        
+        # Be polite to the server
+        time.sleep(0.5)
     
     # Prepare output file
     output_file = "books_info.txt"
@@ -104,25 +117,15 @@ def main():
         f.write("Format: Nazev knihy, Autor, Zanr - PDF URL\n")
         f.write("=" * 80 + "\n\n")
         
-        for i, book in enumerate(books, 1):
-            print(f"[{i}/{len(books)}] Zpracovavam: {book['title']}")
-            
-            # Get details for each book
-            details = scrape_book_details(book['url'])
-            
+        for book in seen.values():
             # Format output
-            author = details['author']
-            genre = details['genre']
-            pdf_url = details['pdf_url'] if details['pdf_url'] else "PDF nenalezeno"
+            pdf_url = book['pdf_url'] if book['pdf_url'] else "PDF nenalezeno"
             
-            line = f"{book['title']}, {author}, {genre} - {pdf_url}\n"
+            line = f"{book['title']}, {book['author']}, {book['genre']} - {pdf_url}\n"
             f.write(line)
-            
-            # Be polite to the server
-            time.sleep(0.5)
         
-        print(f"\nHotovo! Vysledky ulozeny do: {output_file}")
-        print(f"Celkem zpracovano: {len(books)} knih")
+    print(f"\nHotovo! Vysledky ulozeny do: {output_file}")
+    print(f"Celkem v katalogu: {len(seen)} knih")
 
 if __name__ == "__main__":
     main()
@@ -19,6 +19,10 @@
     // Dark theme is default (no data-theme attribute needed)
 })();
 
+// script.js lives at the site root, so its URL tells where the root is
+// (only available while the script runs, not in event handlers)
+const SITE_ROOT = document.currentScript ? new URL('.', document.currentScript.src).href : null;
+
 document.addEventListener('DOMContentLoaded', () => {
     // ========================================
     // THEME TOGGLE FUNCTIONALITY
@@ -108,57 +112,34 @@ document.addEventListener('DOMContentLoaded', () => {
     const loadDynamicCounts = async () => {
         const literaturaCountEl = document.getElementById('literatura-count');
         const ictCountEl = document.getElementById('ict-count');
+        const chemieCountEl = document.getElementById('chemie-count');
 
         // Only run on the home page where these elements exist
-        if (!literaturaCountEl && !ictCountEl) return;
-
-        // Load literatura count
-        if (literaturaCountEl) {
-            try {
-                const response = await fetch('literatura/index.html');
-                if (response.ok) {
-                    const html = await response.text();
-                    // Parse the books array - count objects in the array
-                    const booksMatch = html.match(/const\s+books\s*=\s*\[[\s\S]*?\];/);
-                    if (booksMatch) {
-                        // Count the number of book objects (filename entries)
-                        const filenameCount = (booksMatch[0].match(/"filename":/g) || []).length;
-                        const bookWord = filenameCount === 1 ? 'kniha' :
-                            (filenameCount >= 2 && filenameCount <= 4) ? 'knihy' : 'knih';
-                        literaturaCountEl.textContent = `${filenameCount} ${bookWord}`;
-                    } else {
-                        literaturaCountEl.textContent = '33 knih'; // Fallback
-                    }
-                } else {
-                    literaturaCountEl.textContent = '33 knih'; // Fallback
-                }
-            } catch (error) {
-                // Fallback for file:// protocol or other errors
-                literaturaCountEl.textContent = '33 knih';
-                console.log('literatura count fallback:', error.message);
+        if (!literaturaCountEl && !ictCountEl && !chemieCountEl) return;
+
+        const plural = (count, one, few, many) =>
+            `${count} ${count === 1 ? one : (count >= 2 && count <= 4) ? few : many}`;
+
+        // Fallbacks for file:// protocol or a site built without the stats
+        let stats = { books: 33, sections: { ict: 5, chemie: 25 } };
+        try {
+            // Written by site_stats.py during the build
+            const response = await fetch('site-stats.json');
+            if (response.ok) {
+                stats = await response.json();
             }
+        } catch (error) {
+            console.log('site stats fallback:', error.message);
         }
 
-        // Load ICT count
-        if (ictCountEl) {
-            try {
-                const response = await fetch('ict/index.html');
-                if (response.ok) {
-                    const html = await response.text();
-                    // Count topic-card links (excluding the index.html itself)
-                    const topicMatches = html.match(/class="topic-card/g) || [];
-                    const topicCount = topicMatches.length;
-                    const topicWord = topicCount === 1 ? 'okruh' :
-                        (topicCount >= 2 && topicCount <= 4) ? 'okruhy' : 'okruhů';
-                    ictCountEl.textContent = `${topicCount} ${topicWord}`;
-                } else {
-                    ictCountEl.textContent = '5 okruhů'; // Fallback
-                }
-            } catch (error) {
-                // Fallback for file:// protocol or other errors
-                ictCountEl.textContent = '5 okruhů';
-                console.log('ICT count fallback:', error.message);
-            }
+        if (literaturaCountEl) {
+            literaturaCountEl.textContent = plural(stats.books, 'kniha', 'knihy', 'knih');
+        }
+        if (ictCountEl && stats.sections.ict) {
+            ictCountEl.textContent = plural(stats.sections.ict, 'okruh', 'okruhy', 'okruhů');
+        }
+        if (chemieCountEl && stats.sections.chemie) {
+            chemieCountEl.textContent = plural(stats.sections.chemie, 'téma', 'témata', 'témat');
         }
     };
 
@@ -186,6 +167,109 @@ document.addEventListener('DOMContentLoaded', () => {
 
     addFooterDisclaimer();
 
+    // ========================================
+    // OFFLINE SUPPORT
+    // ========================================
+
+    // sw.js is written by generate_service_worker.py; it precaches the
+    // section of every visited page for offline studying
+    const registerServiceWorker = async () => {
+        if (!SITE_ROOT || !('serviceWorker' in navigator) || location.protocol === 'file:') return;
+
+        try {
+            await navigator.serviceWorker.register(SITE_ROOT + 'sw.js');
+            const registration = await navigator.serviceWorker.ready;
+            if (registration.active) {
+                registration.active.postMessage({ type: 'visit', url: location.href });
+            }
+        } catch (error) {
+            // Site not built with a service worker, or not allowed here
+            console.log('service worker unavailable:', error.message);
+        }
+    };
+
+    registerServiceWorker();
+
+    // ========================================
+    // FULL-TEXT READER
+    // ========================================
+
+    // Book pages only ship an excerpt; book_reader.py splits the full text
+    // into chunks, which are loaded one by one as the reader scrolls
+    const initBookReader = async () => {
+        const reader = document.querySelector('.book-reader');
+        if (!reader || !('IntersectionObserver' in window)) return;
+
+        const textEl = reader.querySelector('.book-reader-text');
+        const statusEl = reader.querySelector('.book-reader-status');
+        const indexUrl = new URL(reader.dataset.chunks, location.href);
+
+        let index;
+        try {
+            const response = await fetch(indexUrl, { cache: 'no-cache' });
+            if (!response.ok) return;
+            index = await response.json();
+        } catch (error) {
+            // Keep the link to the first chunk
+            return;
+        }
+        if (!index.chunks.length) return;
+
+        const sentinel = document.createElement('div');
+        textEl.after(sentinel);
+
+        let next = 0;
+        let loading = false;
+        let observer;
+
+        const loadNext = async () => {
+            if (loading || next >= index.chunks.length) return;
+            loading = true;
+
+            const chunk = index.chunks[next];
+            try {
+                // The version makes cached copies of an older text stale
+                const response = await fetch(new URL(`${chunk.file}?v=${index.version}`, indexUrl));
+                if (!response.ok) throw new Error(`HTTP ${response.status}`);
+
+                const section = document.createElement('div');
+                section.className = 'book-reader-chunk';
+                section.dataset.offset = chunk.offset;
+                // Chunks are standalone documents; only their text is shown
+                const chunkDoc = new DOMParser().parseFromString(await response.text(), 'text/html');
+                section.innerHTML = (chunkDoc.querySelector('main') || chunkDoc.body).innerHTML;
+                textEl.appendChild(section);
+                next++;
+
+                if (next < index.chunks.length) {
+                    const loaded = Math.round((chunk.offset + chunk.length) / index.length * 100);
+                    statusEl.textContent = `Načteno ${loaded} % textu…`;
+                } else {
+                    statusEl.remove();
+                    observer.disconnect();
+                }
+            } catch (error) {
+                statusEl.textContent = 'Další část textu se nepodařilo načíst.';
+                observer.disconnect();
+            }
+            loading = false;
+
+            // A short chunk may leave the sentinel in view, which the
+            // observer does not report again
+            if (next < index.chunks.length && sentinel.getBoundingClientRect().top < window.innerHeight + 600) {
+                loadNext();
+            }
+        };
+
+        statusEl.textContent = 'Načítání textu…';
+        observer = new IntersectionObserver(entries => {
+            if (entries.some(entry => entry.isIntersecting)) loadNext();
+        }, { rootMargin: '600px 0px' });
+        observer.observe(sentinel);
+    };
+
+    initBookReader();
+
     // Smooth scroll for anchor links
     document.querySelectorAll('a[href^="#"]').forEach(anchor => {
         anchor.addEventListener('click', function (e) {
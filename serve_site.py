@@ -0,0 +1,492 @@
+"""
+Static File Server for Maturita Portal
+
+Serves the staged build (dist, see build_site.py) without an external web
+server:
+
+- asyncio, HTTP/1.1 keep-alive, GET and HEAD
+- file bodies go out with loop.sendfile() (zero-copy os.sendfile where the
+  platform supports it)
+- strong ETags taken from the build manifests (precache-manifest.json,
+  asset-manifest.json); files changed after the build are hashed instead
+- precompressed .br / .gz siblings (python build_site.py --compress) are
+  served to clients that accept them
+- only the files build_site.py publishes are served: no dot files, scripts,
+  sources or caches, also when pointed at the working tree
+- metadata (size, ETag, type, variants) is kept in memory, so conditional
+  requests are answered with 304 without touching the disk
+- fingerprinted assets get the immutable Cache-Control from
+  asset-manifest.json, everything else is revalidated
+
+Usage:
+    python serve_site.py [site_root] [--host HOST] [--port PORT]
+                                                serve (default dist on 127.0.0.1:8000)
+    python serve_site.py --bench [site_root]    local load test
+"""
+
+import asyncio
+import hashlib
+import json
+import mimetypes
+import multiprocessing
+import os
+import posixpath
+import socket
+import sys
+import time
+from collections import namedtuple
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+from build_site import ENCODINGS, LIVE_DIR_NAME, is_publishable
+from fingerprint_assets import DEFAULT_CACHE_CONTROL, load_manifest
+from generate_service_worker import PRECACHE_MANIFEST_NAME, iter_site_files
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DIST_DIR = os.path.join(SCRIPT_DIR, LIVE_DIR_NAME)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8000
+
+# How often the manifests are checked for a rebuild
+MANIFEST_CHECK_INTERVAL = 1.0
+
+# Largest request head accepted
+MAX_HEADER_LINES = 100
+
+STATUS_TEXT = {
+    200: 'OK', 301: 'Moved Permanently', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 500: 'Internal Server Error'
+}
+
+# Benchmark settings
+BENCH_CONNECTIONS = 32
+BENCH_REQUESTS = 5000
+
+FileMeta = namedtuple('FileMeta', ['path', 'size', 'etag', 'content_type', 'cache_control', 'variants'])
+
+mimetypes.add_type('text/javascript', '.js')
+mimetypes.add_type('application/json', '.json')
+
+
+def _content_type(path):
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if content_type.startswith('text/') or content_type in ('application/json', 'image/svg+xml'):
+        content_type += '; charset=utf-8'
+    return content_type
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 16), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def accepted_encodings(header):
+    """
+    Return the content codings an Accept-Encoding header allows.
+    """
+    accepted = set()
+    for part in header.split(','):
+        name, _, params = part.partition(';')
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name.strip() and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class SiteFiles:
+    """
+    In-memory metadata of the site's files, keyed by URL path.
+
+    Metadata is collected on the first request for a path and dropped
+    when a manifest changes (i.e. after a rebuild).
+    """
+
+    def __init__(self, root):
+        # Not resolved: dist is a symlink that moves to each new build
+        self.root = os.path.abspath(root)
+        self.entries = {}
+        self.hashes = {}
+        self.immutable = {}
+        self.manifest_mtime = 0
+        self._manifest_state = None
+        self._checked_at = 0
+        self._load_manifests()
+
+    def _manifest_paths(self):
+        return [os.path.join(self.root, PRECACHE_MANIFEST_NAME), os.path.join(self.root, 'asset-manifest.json')]
+
+    def _load_manifests(self):
+        state = []
+        for path in self._manifest_paths():
+            try:
+                state.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                state.append(None)
+        if state == self._manifest_state:
+            return
+
+        self._manifest_state = state
+        self.manifest_mtime = max((mtime for mtime in state if mtime), default=0)
+        self.entries = {}
+        self.hashes = {}
+        self.immutable = {}
+
+        try:
+            with open(self._manifest_paths()[0], 'r', encoding='utf-8') as f:
+                for entries in json.load(f)['sections'].values():
+                    self.hashes.update(entries)
+        except (OSError, ValueError, KeyError):
+            pass
+
+        assets = load_manifest(self.root)
+        if assets:
+            immutable = assets['cache_control']['immutable']
+            for entry in assets['assets'].values():
+                self.hashes[entry['path']] = entry['sha256'][:16]
+                self.immutable[entry['path']] = immutable
+
+    def _resolve(self, url_path):
+        """Map a URL path to a published file inside the root, or None."""
+        path = unquote(url_path)
+        if url_path.endswith('/'):
+            path = posixpath.join(path, 'index.html')
+        relative = path.lstrip('/')
+        # Rejects .., dot files and everything build_site.py would not deploy
+        if posixpath.normpath(relative) != relative or not is_publishable(relative):
+            return None, None
+        root = os.path.realpath(self.root)
+        full_path = os.path.realpath(os.path.join(root, *relative.split('/')))
+        if not full_path.startswith(root + os.sep):
+            return None, None
+        if not os.path.isfile(full_path):
+            return None, None
+        return full_path, relative
+
+    def lookup(self, url_path):
+        """
+        Return the FileMeta for a URL path, or None if there is no such file.
+        """
+        now = time.monotonic()
+        if now - self._checked_at > MANIFEST_CHECK_INTERVAL:
+            self._checked_at = now
+            self._load_manifests()
+
+        meta = self.entries.get(url_path)
+        if meta is not None:
+            return meta
+
+        full_path, relative = self._resolve(url_path)
+        if full_path is None:
+            return None
+
+        stat = os.stat(full_path)
+        digest = self.hashes.get(relative)
+        if digest is None or stat.st_mtime_ns > self.manifest_mtime:
+            # Not part of the build, or edited since
+            digest = _file_hash(full_path)
+
+        variants = {}
+        for encoding, suffix in ENCODINGS:
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime_ns >= stat.st_mtime_ns:
+                variants[encoding] = (full_path + suffix, variant_stat.st_size)
+
+        meta = FileMeta(
+            path=full_path,
+            size=stat.st_size,
+            etag=f'"{digest}"',
+            content_type=_content_type(full_path),
+            cache_control=self.immutable.get(relative, DEFAULT_CACHE_CONTROL),
+            variants=variants
+        )
+        self.entries[url_path] = meta
+        return meta
+
+
+def _etag_matches(header, etag):
+    if header.strip() == '*':
+        return True
+    return etag in (tag.strip().removeprefix('W/') for tag in header.split(','))
+
+
+async def _read_request(reader):
+    """Read a request head; returns (method, target, version, headers) or None."""
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    parts = request_line.decode('latin-1').split()
+    if len(parts) != 3:
+        return ('', '', 'HTTP/1.0', headers)
+    return parts[0], parts[1], parts[2], headers
+
+
+def _head(status, headers):
+    lines = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}"]
+    lines.extend(f"{name}: {value}" for name, value in headers)
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1')
+
+
+async def _respond(site, writer, method, target, headers, keep_alive, retry=True):
+    connection = 'keep-alive' if keep_alive else 'close'
+    common = [('Date', formatdate(usegmt=True)), ('Connection', connection)]
+
+    if method not in ('GET', 'HEAD'):
+        body = b'Method Not Allowed\n'
+        writer.write(_head(405, common + [('Allow', 'GET, HEAD'), ('Content-Length', len(body))]) + body)
+        return
+
+    url_path = urlsplit(target).path or '/'
+    meta = site.lookup(url_path)
+    if meta is None and site.lookup(url_path + '/') is not None:
+        # Directory without the slash; relative links need it
+        writer.write(_head(301, common + [('Location', url_path + '/'), ('Content-Length', 0)]))
+        return
+    if meta is None:
+        body = b'Not Found\n'
+        writer.write(_head(404, common + [('Content-Type', 'text/plain; charset=utf-8'),
+                                         ('Content-Length', len(body))]) + body)
+        return
+
+    path, size, etag = meta.path, meta.size, meta.etag
+    response_headers = common + [('Content-Type', meta.content_type), ('Cache-Control', meta.cache_control)]
+    if meta.variants:
+        response_headers.append(('Vary', 'Accept-Encoding'))
+        accepted = accepted_encodings(headers.get('accept-encoding', ''))
+        for encoding, _ in ENCODINGS:
+            if encoding in accepted and encoding in meta.variants:
+                path, size = meta.variants[encoding]
+                etag = f'{etag[:-1]}-{encoding}"'
+                response_headers.append(('Content-Encoding', encoding))
+                break
+    response_headers.append(('ETag', etag))
+
+    if _etag_matches(headers.get('if-none-match', ''), etag):
+        writer.write(_head(304, [header for header in response_headers
+                                 if header[0] not in ('Content-Type', 'Content-Encoding')]))
+        return
+
+    try:
+        f = open(path, 'rb')
+    except FileNotFoundError:
+        f = None
+    if f is None or os.fstat(f.fileno()).st_size != size:
+        # Changed on disk since the metadata was collected
+        if f is not None:
+            f.close()
+        site.entries.pop(url_path, None)
+        if retry:
+            await _respond(site, writer, method, target, headers, keep_alive, retry=False)
+            return
+        raise OSError(f"{path} keeps changing")
+
+    with f:
+        writer.write(_head(200, response_headers + [('Content-Length', size)]))
+        if method == 'HEAD' or size == 0:
+            return
+        await writer.drain()
+        await asyncio.get_running_loop().sendfile(writer.transport, f, 0, size)
+
+
+async def handle_connection(site, reader, writer):
+    """Serve the requests of one keep-alive connection."""
+    try:
+        while True:
+            request = await _read_request(reader)
+            if request is None:
+                break
+            method, target, version, headers = request
+
+            connection = headers.get('connection', '').lower()
+            keep_alive = (version == 'HTTP/1.1' and connection != 'close') or connection == 'keep-alive'
+            if not method:
+                body = b'Bad Request\n'
+                writer.write(_head(400, [('Connection', 'close'), ('Content-Length', len(body))]) + body)
+                break
+
+            try:
+                await _respond(site, writer, method, target, headers, keep_alive)
+            except OSError as e:
+                print(f"  ERROR serving {target}: {e}")
+                break
+            await writer.drain()
+
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(root=DIST_DIR, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """
+    Run the server until cancelled.
+
+    Args:
+        root: Site directory
+        host: Address to listen on
+        port: TCP port
+        ready: Optional multiprocessing.Event set once the server listens
+    """
+    site = SiteFiles(root)
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(site, reader, writer), host, port, reuse_address=True
+    )
+    if ready is not None:
+        ready.set()
+    async with server:
+        await server.serve_forever()
+
+
+def _run_server(root, port, ready):
+    try:
+        asyncio.run(serve(root, port=port, ready=ready))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _bench_client(port, paths, count, conditional, etags, latencies):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    try:
+        for i in range(count):
+            path = paths[i % len(paths)]
+            request = f"GET /{path} HTTP/1.1\r\nHost: localhost\r\nAccept-Encoding: br, gzip\r\n"
+            if conditional and path in etags:
+                request += f"If-None-Match: {etags[path]}\r\n"
+
+            start = time.perf_counter()
+            writer.write((request + "\r\n").encode('latin-1'))
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                name = name.lower()
+                if name == 'content-length':
+                    length = int(value)
+                elif name == 'etag':
+                    etags[path] = value.strip()
+            if length:
+                await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+
+            if not status_line.startswith((b'HTTP/1.1 200', b'HTTP/1.1 304')):
+                raise RuntimeError(f"/{path}: {status_line.decode('latin-1').strip()}")
+    finally:
+        writer.close()
+
+
+async def _bench_round(port, paths, connections, requests, conditional, etags):
+    latencies = []
+    per_connection = max(1, requests // connections)
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _bench_client(port, paths[i:] + paths[:i], per_connection, conditional, etags, latencies)
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'rate': len(latencies) / elapsed,
+        'p50': latencies[len(latencies) // 2] * 1000,
+        'p99': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    }
+
+
+def benchmark(root=DIST_DIR, connections=BENCH_CONNECTIONS, requests=BENCH_REQUESTS):
+    """
+    Load-test a local server: full responses, then conditional requests.
+
+    Returns:
+        Dictionary round name -> {'requests', 'rate', 'p50', 'p99'}
+    """
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=_run_server, args=(root, port, ready), daemon=True)
+    server.start()
+    try:
+        if not ready.wait(10):
+            raise RuntimeError("server did not start")
+
+        # The files the server answers for, not build-manifest.json
+        paths = [path for path in iter_site_files(root) if is_publishable(path)]
+        etags = {}
+        return {
+            'full': asyncio.run(_bench_round(port, paths, connections, requests, False, etags)),
+            'conditional (304)': asyncio.run(_bench_round(port, paths, connections, requests, True, etags))
+        }
+    finally:
+        server.terminate()
+        server.join()
+
+
+def _option(name, default):
+    if name in sys.argv:
+        index = sys.argv.index(name)
+        if index + 1 < len(sys.argv):
+            return sys.argv[index + 1]
+    return default
+
+
+def main():
+    """Serve the site or run the load test."""
+
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1)
+            if not arg.startswith('--') and sys.argv[i - 1] not in ('--host', '--port')]
+    root = os.path.abspath(args[0]) if args else DIST_DIR
+
+    if not os.path.isdir(root):
+        print(f"{root} does not exist, run python build_site.py first")
+        sys.exit(1)
+
+    if '--bench' in sys.argv:
+        print("=" * 60)
+        print("Static Server Load Test")
+        print("=" * 60)
+        print(f"  Connections: {BENCH_CONNECTIONS}, requests per round: {BENCH_REQUESTS}")
+        for name, result in benchmark(root).items():
+            print(f"  {name:<18} {result['rate']:>8.0f} req/s   "
+                  f"p50 {result['p50']:.2f} ms   p99 {result['p99']:.2f} ms")
+        print("=" * 60)
+        return
+
+    host = _option('--host', DEFAULT_HOST)
+    port = int(_option('--port', DEFAULT_PORT))
+    print(f"Serving {root} on http://{host}:{port}/ (Ctrl+C to stop)")
+    try:
+        asyncio.run(serve(root, host=host, port=port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Site Statistics for Maturita Portal
+
+Writes site-stats.json with the numbers the home page shows, so script.js
+makes one small request instead of downloading and scanning the section
+index pages:
+
+    {
+      "books": 33,                      - books in the literatura listing
+      "sections": {"ict": 5,            - ICT okruhy
+                   "ict/hw": 10, ...,   - topics per section
+                   "chemie": 25},
+      "updated": "2025-12-14",          - date the numbers last changed
+      "hash": "..."                     - hash of books and sections
+    }
+
+Usage:
+    python site_stats.py [site_root]
+"""
+
+import datetime
+import hashlib
+import json
+import os
+import re
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+STATS_NAME = "site-stats.json"
+
+# Sections whose topics are numbered pages, e.g. chemie/01-vodik-ph.html
+TOPIC_PAGE_RE = re.compile(r'^\d+-.+\.html$')
+
+
+def count_books(root):
+    """Number of books in literatura/books.json (the listing's catalog)."""
+    try:
+        with open(os.path.join(root, "literatura", "books.json"), 'r', encoding='utf-8') as f:
+            return len(json.load(f))
+    except (OSError, ValueError):
+        return 0
+
+
+def count_topics(directory):
+    """Number of numbered topic pages in a directory."""
+    try:
+        return sum(1 for name in os.listdir(directory) if TOPIC_PAGE_RE.match(name))
+    except OSError:
+        return 0
+
+
+def collect_stats(root=SCRIPT_DIR):
+    """
+    Count books and topics.
+
+    Returns:
+        Dictionary with books and sections
+    """
+    sections = {}
+
+    ict_dir = os.path.join(root, "ict")
+    if os.path.isdir(ict_dir):
+        for name in sorted(os.listdir(ict_dir)):
+            count = count_topics(os.path.join(ict_dir, name))
+            if count:
+                sections[f"ict/{name}"] = count
+        sections["ict"] = sum(1 for name in sections if name.startswith("ict/"))
+
+    chemie_count = count_topics(os.path.join(root, "chemie"))
+    if chemie_count:
+        sections["chemie"] = chemie_count
+
+    return {'books': count_books(root), 'sections': dict(sorted(sections.items()))}
+
+
+def write_site_stats(root=SCRIPT_DIR):
+    """
+    Write site-stats.json.
+
+    The updated date only moves when the numbers change, so rebuilding
+    without changes leaves the file (and its cached copies) untouched.
+
+    Returns:
+        The written statistics
+    """
+    stats = collect_stats(root)
+    digest = hashlib.sha256(json.dumps(stats, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+    path = os.path.join(root, STATS_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    if previous.get('hash') == digest:
+        return previous
+
+    stats['updated'] = datetime.date.today().isoformat()
+    stats['hash'] = digest
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(stats, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+    os.replace(tmp_path, path)
+    return stats
+
+
+def main():
+    """Write site-stats.json for the site."""
+
+    root = os.path.abspath(sys.argv[1]) if len(sys.argv) > 1 else SCRIPT_DIR
+
+    stats = write_site_stats(root)
+
+    print("=" * 60)
+    print("Site Statistics")
+    print("=" * 60)
+    print(f"  Books: {stats['books']}")
+    for name, count in stats['sections'].items():
+        print(f"  {name}: {count}")
+    print(f"  Updated: {stats['updated']} ({stats['hash']})")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Text Normalizer for Maturita Portal
+
+Turns the raw page texts of an extracted PDF into clean paragraphs in a
+single streaming pass:
+
+1. Removes page numbers and running headers/footers. Headers and footers
+   are lines at the top or bottom of a page that repeat on many pages;
+   they are learned from the first SAMPLE_PAGES pages.
+2. Joins words hyphenated across line breaks, including the Czech rule
+   of repeating the hyphen of a compound on the next line
+   ("černo-" + "-bílý" -> "černo-bílý").
+3. Reflows lines into paragraphs separated by a blank line. A line that
+   ends well short of the usual line width ends its paragraph, and
+   bullet points always start a new one.
+
+Run it directly to benchmark normalization throughput on literatura/pdfs:
+
+    python text_normalizer.py [max_pdfs]
+"""
+
+import os
+import re
+import sys
+import time
+from collections import Counter
+from itertools import chain, islice
+
+# Number of lines at each page edge checked for headers and page numbers
+EDGE_LINES = 2
+
+# Pages buffered to learn running headers and the usual line width
+SAMPLE_PAGES = 12
+
+# An edge line is a running header if it appears on this share of pages
+HEADER_MIN_SHARE = 0.5
+
+# Lines shorter than this share of the usual width end a paragraph
+SHORT_LINE_RATIO = 0.75
+
+PAGE_NUMBER_RE = re.compile(r'^[-–—\s]*(?:(?:strana|str\.)\s*)?\d{1,4}(?:\s*(?:/|z)\s*\d{1,4})?[-–—\s]*$', re.IGNORECASE)
+BULLET_RE = re.compile(r'^(?:[•▪●■◦→]|[-–—*]\s|\d{1,2}[.)]\s)')
+SPACES_RE = re.compile(r'\s+')
+DIGITS_RE = re.compile(r'\d+')
+
+
+def _signature(line):
+    """Normalize a line so headers with changing page numbers compare equal."""
+    return DIGITS_RE.sub('#', SPACES_RE.sub(' ', line.strip().lower()))
+
+
+def _edge_lines(lines):
+    """Return the non-empty lines at the top and bottom of a page."""
+    content = [line for line in lines if line.strip()]
+    if len(content) <= 2 * EDGE_LINES:
+        return content
+    return content[:EDGE_LINES] + content[-EDGE_LINES:]
+
+
+def learn_layout(pages):
+    """
+    Learn running headers/footers and the usual line width from sample pages.
+
+    Args:
+        pages: List of page texts
+
+    Returns:
+        Tuple of (set of header signatures, usual line width)
+    """
+    headers = set()
+
+    # With fewer pages, a repeated line is more likely content than a header
+    if len(pages) >= 3:
+        counts = Counter()
+        for page in pages:
+            counts.update({_signature(line) for line in _edge_lines(page.split('\n'))})
+        min_count = max(2, HEADER_MIN_SHARE * len(pages))
+        headers = {sig for sig, count in counts.items() if count >= min_count}
+
+    lengths = sorted(len(line.strip()) for page in pages for line in page.split('\n') if line.strip())
+    width = lengths[int(len(lengths) * 0.9)] if lengths else 0
+
+    return headers, width
+
+
+def _is_artifact(line, headers):
+    return bool(PAGE_NUMBER_RE.match(line)) or _signature(line) in headers
+
+
+def strip_page_artifacts(lines, headers):
+    """
+    Remove page numbers and running headers/footers from the edges of a page.
+    """
+    start, end = 0, len(lines)
+
+    for _ in range(EDGE_LINES):
+        while start < end and not lines[start].strip():
+            start += 1
+        if start < end and _is_artifact(lines[start], headers):
+            start += 1
+        else:
+            break
+
+    for _ in range(EDGE_LINES):
+        while end > start and not lines[end - 1].strip():
+            end -= 1
+        if end > start and _is_artifact(lines[end - 1], headers):
+            end -= 1
+        else:
+            break
+
+    return lines[start:end]
+
+
+def _join_line(paragraph, line):
+    """Append a line to a paragraph, undoing hyphenation at the line break."""
+    if paragraph.endswith(('-', '\xad')) and len(paragraph) > 1 and paragraph[-2].isalpha():
+        # Czech repeats the hyphen of a compound word on the next line
+        if line.startswith('-') and line[1:2].isalpha():
+            return paragraph + line[1:]
+        if line[0].islower():
+            return paragraph[:-1] + line
+    return paragraph + ' ' + line
+
+
+def iter_normalized(pages, sample_pages=SAMPLE_PAGES):
+    """
+    Normalize page texts into paragraphs, streaming.
+
+    Args:
+        pages: Iterable of page texts, in page order
+        sample_pages: Pages buffered up front to learn the layout
+
+    Yields:
+        Text chunks that join into paragraphs separated by blank lines
+    """
+    pages = iter(pages)
+    sample = list(islice(pages, sample_pages))
+    headers, width = learn_layout(sample)
+    short_line = width * SHORT_LINE_RATIO
+
+    paragraph = ""
+    first = True
+
+    for page in chain(sample, pages):
+        for raw_line in strip_page_artifacts(page.split('\n'), headers):
+            line = SPACES_RE.sub(' ', raw_line).strip()
+
+            if not line or (paragraph and BULLET_RE.match(line)):
+                if paragraph:
+                    yield paragraph if first else "\n\n" + paragraph
+                    first = False
+                    paragraph = ""
+                if not line:
+                    continue
+
+            paragraph = _join_line(paragraph, line) if paragraph else line
+
+            # A line that stops early is the last line of its paragraph
+            if len(line) < short_line and not line.endswith(('-', '\xad')):
+                yield paragraph if first else "\n\n" + paragraph
+                first = False
+                paragraph = ""
+
+    if paragraph:
+        yield paragraph if first else "\n\n" + paragraph
+
+
+def normalize_pages(pages, sample_pages=SAMPLE_PAGES):
+    """
+    Normalize page texts into a single clean text.
+    """
+    return "".join(iter_normalized(pages, sample_pages))
+
+
+def main():
+    """Benchmark normalization throughput against extraction on literatura/pdfs."""
+
+    from pdf_extract import extract_pages
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    pdf_dir = os.path.join(script_dir, "literatura", "pdfs")
+    limit = int(sys.argv[1]) if len(sys.argv) > 1 else None
+
+    pdf_paths = sorted(os.path.join(pdf_dir, name) for name in os.listdir(pdf_dir)
+                       if name.endswith('.pdf'))[:limit]
+
+    print("=" * 60)
+    print("Text Normalizer Benchmark")
+    print("=" * 60)
+
+    start = time.perf_counter()
+    documents = [extract_pages(pdf_path) for pdf_path in pdf_paths]
+    extract_time = time.perf_counter() - start
+
+    raw_chars = sum(len(page) for pages in documents for page in pages)
+
+    # Repeat normalization so short corpora still give a stable timing
+    rounds = 5
+    start = time.perf_counter()
+    for _ in range(rounds):
+        normalized = [normalize_pages(pages) for pages in documents]
+    normalize_time = (time.perf_counter() - start) / rounds
+
+    clean_chars = sum(len(text) for text in normalized)
+    mb = raw_chars / (1024 * 1024)
+
+    print(f"  PDFs: {len(documents)}")
+    print(f"  Pages: {sum(len(pages) for pages in documents)}")
+    print(f"  Raw text: {raw_chars} chars, normalized: {clean_chars} chars")
+    print(f"  Extraction: {extract_time:.2f} s")
+    print(f"  Normalization: {normalize_time:.3f} s ({mb / max(normalize_time, 1e-9):.1f} MB/s)")
+    print(f"  Normalization share of total: {normalize_time / (extract_time + normalize_time):.1%}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ Script to update footer on all HTML pages to include privacy policy and contact
 import os
 import re
 
+from fingerprint_assets import SKIP_DIRS
+
 # Old footer pattern
 old_footer_pattern = r'<footer>\s*<p>© 2025 MaturitaPortál \| Vytvořeno pro přípravu na maturitu</p>\s*</footer>'
 
@@ -55,7 +57,7 @@ def update_file(filepath):
             return False
         
         # Determine depth level
-        depth = filepath.count(os.sep) - os.getcwd().count(os.sep)
+        depth = os.path.relpath(filepath).count(os.sep)
         
         if depth == 0:
             # Root level
@@ -90,8 +92,8 @@ def main():
     
     # Walk through all directories
     for root, dirs, files in os.walk('.'):
-        # Skip hidden directories and python cache
-        dirs[:] = [d for d in dirs if not d.startswith('.') and d != '__pycache__']
+        # Skip hidden directories, tooling and the staged build
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d not in SKIP_DIRS]
         
         for file in files:
             if file.endswith('.html'):